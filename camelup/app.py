@@ -1,5 +1,4 @@
 import os
-import random
 import sys
 import tkinter as tk
 
@@ -11,6 +10,7 @@ from PIL import Image, ImageDraw, ImageFont, ImageTk
 
 import camelup.camelup as camelup
 import camelup.config as config
+import camelup.mcts as mcts
 import camelup.treesearch as treesearch
 
 
@@ -18,6 +18,8 @@ CURR_DIR = os.path.dirname(os.path.abspath(__file__))
 
 font = ImageFont.truetype(os.path.join(CURR_DIR, "fonts/arial.ttf"), 9)
 
+ENGINES = {"treesearch": treesearch, "mcts": mcts}
+
 
 def create_board(img, game):
     """Create the board from the base image
@@ -419,12 +421,12 @@ class GamePage(tk.Frame):
                 for key in self.game.camel_dict.keys()
                 if self.game.camel_dict[key]["need_roll"]
             ]
-            camel = random.choice(need_roll)
-            roll = random.randint(1, 3)
+            camel = self.game.rng.choice(need_roll)
+            roll = self.game.rng.randint(1, 3)
             output = self.game.play(
-                self.game.available_moves()[self.combo.get()]
-                .replace("camel", f"'{camel}'")
-                .replace(", roll", f", {roll}")
+                self.game.available_moves()[self.combo.get()]._replace(
+                    camel=camel, roll=roll
+                )
             )
             self.turn_info.set(
                 f"Camel: {camel} Rolled: {str(roll)}\n{self.turn_info.get()}"
@@ -452,25 +454,22 @@ class GamePage(tk.Frame):
         else:
             self.game.play(self.game.available_moves()[self.combo.get()])
         if self.game.player_dict[self.game.state]["name"] == "Robot":
-            moves = treesearch.get_move(self.game)
+            moves = ENGINES[config.ENGINE].get_move(self.game)
             best_move = max(moves, key=moves.get)
             self.turn_info.set(
-                f"Robot Move: {best_move} Utility: {moves[best_move]}\n{self.turn_info.get()}"
+                f"Robot Move: {self.game.move_label(best_move)} "
+                f"Utility: {moves[best_move]}\n{self.turn_info.get()}"
             )
             self.turn_info_label.replace("1.0", tk.END, self.turn_info.get())
-            if "roll" in best_move:
+            if best_move.kind == "roll":
                 need_roll = [
                     key
                     for key in self.game.camel_dict.keys()
                     if self.game.camel_dict[key]["need_roll"]
                 ]
-                camel = random.choice(need_roll)
-                roll = random.randint(1, 3)
-                output = self.game.play(
-                    best_move.replace("camel", f"'{camel}'").replace(
-                        ", roll", f", {roll}"
-                    )
-                )
+                camel = self.game.rng.choice(need_roll)
+                roll = self.game.rng.randint(1, 3)
+                output = self.game.play(best_move._replace(camel=camel, roll=roll))
                 self.turn_info.set(
                     f"Camel: {camel} Rolled: {str(roll)}\n{self.turn_info.get()}"
                 )
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""Module with micro-benchmarks of the relational kernels in `utilities`
+
+Times `numpy_left_join`, `numpy_group_by_sum` and `add_col_np` on random tables
+shaped like the ones built from self-play logs, bet rows keyed by player and
+camel joined against probabilities by camel, at growing numbers of rows. Time per
+row staying flat as the rows grow means the kernel scales linearly. Also times
+`Game.copy` against a deepcopy of the game and `treesearch.get_move` over
+growing numbers of worker processes. Run with
+``python -m camelup.benchmarks``.
+"""
+
+import logging
+import time
+
+from copy import deepcopy
+
+import numpy as np
+
+import camelup.camelup as camelup
+import camelup.config as config
+import camelup.treesearch as treesearch
+import camelup.utilities as util
+
+from camelup.dice import BufferedRandom, DiceBlock
+
+logger = logging.getLogger(__name__)
+
+ROWS = [10 ** 4, 10 ** 5, 10 ** 6]
+
+REPEATS = 3
+
+COPIES = 1000
+
+WORKERS = [None, 1, 2, 4]
+
+
+def random_tables(rows, rng, num_players=4):
+    """Random bet and probability tables
+
+    Parameters
+    ----------
+    rows : int
+        Rows of the bet table
+    rng : np.random.Generator
+        Generator to draw the tables from
+    num_players : int
+        Number of players
+
+    Returns
+    -------
+    array
+        Bet table with `player`, `camel`, `value` and `bets` columns
+    array
+        Probability table with a row per camel and `camel`, `counts` and `prob`
+        columns
+    """
+    bets = np.zeros(
+        rows,
+        dtype=[("player", float), ("camel", "U6"), ("value", float), ("bets", float)],
+    )
+    bets["player"] = rng.integers(1, num_players + 1, rows)
+    bets["camel"] = rng.choice(config.CAMELS, rows)
+    bets["value"] = rng.choice(config.BET_POINTS, rows)
+    bets["bets"] = rng.integers(1, 3, rows)
+    probs = np.zeros(
+        len(config.CAMELS), dtype=[("camel", "U6"), ("counts", float), ("prob", float)]
+    )
+    probs["camel"] = config.CAMELS
+    probs["prob"] = rng.dirichlet(np.ones(len(config.CAMELS)))
+    probs["counts"] = probs["prob"] * rows
+    return bets, probs
+
+
+def time_kernels(rows, seed=None):
+    """Best of `REPEATS` wall times of each kernel
+
+    Parameters
+    ----------
+    rows : int
+        Rows of the bet table
+    seed : int
+        Seed of the random tables
+
+    Returns
+    -------
+    dict
+        Dictionary of kernel name and seconds
+    """
+    bets, probs = random_tables(rows, np.random.default_rng(seed))
+    kernels = {
+        "numpy_left_join": lambda: util.numpy_left_join(bets, probs, "camel"),
+        "numpy_group_by_sum": lambda: util.numpy_group_by_sum(bets, "player", "value"),
+        "add_col_np": lambda: util.add_col_np(
+            bets, ["exp_value", "weight"], [bets["value"], bets["bets"]]
+        ),
+    }
+    timings = dict()
+    for name, kernel in kernels.items():
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            kernel()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def best_time(func, number=1):
+    """Best of `REPEATS` wall times of `number` calls
+
+    Parameters
+    ----------
+    func : function
+        Function to time, called without arguments
+    number : int
+        Calls per repeat
+
+    Returns
+    -------
+    float
+        Seconds per call
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def time_copies(num_players=4, number=COPIES, seed=0):
+    """Time of each way to copy a game
+
+    `deepcopy` copies the dicts, `copy` packs the dicts of a played game into a
+    `GameState` and `copy_packed` copies a copy whose dicts were never read, a
+    single buffer copy. `unpack` is the cost of reading the dicts of a copy.
+
+    Parameters
+    ----------
+    num_players : int
+        Number of players
+    number : int
+        Copies per repeat
+    seed : int
+        Seed of the game
+
+    Returns
+    -------
+    dict
+        Dictionary of copy name and seconds per copy
+    """
+    game = camelup.Game(num_players, rng=BufferedRandom(seed))
+    game.play_tile("block", 10)
+    game.play_bet_tile(config.CAMELS[0])
+    packed = game.copy()
+    timings = {
+        "deepcopy": best_time(lambda: deepcopy(game), number),
+        "copy": best_time(game.copy, number),
+        "copy_packed": best_time(packed.copy, number),
+        "unpack": best_time(lambda: packed.copy().camel_dict, number),
+    }
+    for name, seconds in timings.items():
+        logger.info(f"{name}: {seconds * 1e6:.1f}us per copy")
+    return timings
+
+
+def time_search(workers=None, MAX_DEPTH=2, iter=100, seed=0):
+    """Wall time of a search at each number of worker processes
+
+    Every search starts from an empty `treesearch.CACHE` and runs once without
+    pruning, the pool is started inside the timing. Speed up is the time without workers over the
+    time with them, it can't go past the number of cores.
+
+    Parameters
+    ----------
+    workers : list
+        Numbers of processes, None searches in this process, `WORKERS` when None
+    MAX_DEPTH : int
+        Depth of the search
+    iter : int
+        Iterations of the monte carlo at each leaf
+    seed : int
+        Seed of the game and of the common dice
+
+    Returns
+    -------
+    dict
+        Dictionary of number of processes and seconds
+    """
+    game = camelup.Game(4, rng=BufferedRandom(seed))
+    dice = DiceBlock(seed)
+    timings = dict()
+    saved = treesearch.iter, treesearch.prune
+    treesearch.iter, treesearch.prune = iter, False
+    try:
+        for num_workers in WORKERS if workers is None else workers:
+            treesearch.CACHE.clear()
+            start = time.perf_counter()
+            treesearch.get_move(game, MAX_DEPTH, dice=dice, workers=num_workers)
+            timings[num_workers] = time.perf_counter() - start
+    finally:
+        treesearch.iter, treesearch.prune = saved
+    serial = timings.get(None)
+    for num_workers, seconds in timings.items():
+        speed_up = f", {serial / seconds:.2f}x" if serial else ""
+        logger.info(f"get_move, {num_workers} workers: {seconds:.2f}s{speed_up}")
+    return timings
+
+
+def run(rows=None, seed=0):
+    """Times the kernels at each number of rows
+
+    Parameters
+    ----------
+    rows : list
+        Numbers of rows, `ROWS` when None
+    seed : int
+        Seed of the random tables
+
+    Returns
+    -------
+    dict
+        Dictionary of number of rows and the timings of `time_kernels`
+    """
+    results = dict()
+    for num_rows in ROWS if rows is None else rows:
+        results[num_rows] = time_kernels(num_rows, seed)
+        for name, seconds in results[num_rows].items():
+            logger.info(
+                f"{name}, {num_rows} rows: {seconds * 1000:.1f}ms, "
+                f"{seconds / num_rows * 1e9:.0f}ns per row"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    run()
+    time_copies()
+    time_search()
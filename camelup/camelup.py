@@ -3,27 +3,118 @@
 """Main module."""
 
 import logging
-import random
 
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 
 import numpy as np
 
 import camelup.config as config
 import camelup.gameplay as gameplay
+import camelup.simulation as simulation
 import camelup.utilities as util
+import camelup.zobrist as zobrist
+
+from camelup.counts import RaceCounts
+from camelup.dice import BufferedRandom
+from camelup.state import GameState
 
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 50
+
+VECTOR_CHUNK_SIZE = 10000
+
+BATCH_SIZE = 200
+
+VECTOR_BATCH_SIZE = 2000
+
+Move = namedtuple(
+    "Move", ["kind", "camel", "space", "tile_type", "roll"], defaults=[None] * 4
+)
+
+MOVE_KINDS = ["roll", "bet_tile", "winner_card", "loser_card", "tile"]
+
+TILE_TYPES = ["block", "skip"]
+
+MOVE_DTYPE = [("kind", "i1"), ("camel", "i1"), ("space", "i1"), ("tile_type", "i1")]
+
+PLAYS = {
+    "roll": lambda game, move: game.play_roll(move.camel, move.roll),
+    "bet_tile": lambda game, move: game.play_bet_tile(move.camel),
+    "winner_card": lambda game, move: game.play_winner_card(move.camel),
+    "loser_card": lambda game, move: game.play_loser_card(move.camel),
+    "tile": lambda game, move: game.play_tile(move.tile_type, move.space),
+}
+
+Undo = namedtuple("Undo", ["kind", "delta", "state", "position_key"])
+
+PACKED_FIELDS = (
+    "camel_dict",
+    "player_dict",
+    "bet_tiles",
+    "tiles_dict",
+    "winner_bets",
+    "loser_bets",
+)
+
+
+def _monte_chunk(
+    kind, camel_dict, tiles_dict, iter, seed, vectorized=False, dice=None, start=0
+):
+    """Runs one chunk of monte carlo on its own random stream
+
+    Parameters
+    ----------
+    kind : str
+        Either `turn` or `game`
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    iter : int
+        Number of simulations in the chunk
+    seed : np.random.SeedSequence
+        Seed of the chunk's random stream
+    vectorized : bool
+        Simulate games with the vectorized engine
+    dice : DiceBlock
+        Common dice to simulate with instead of the chunk's stream
+    start : int
+        Index in `dice` of the first simulation of the chunk
+
+    Returns
+    -------
+    RaceCounts
+        Counts of the places and tile points of the chunk
+    """
+    result = RaceCounts(camel_dict)
+    if kind == "game" and vectorized:
+        return simulation.game_counts(
+            camel_dict, tiles_dict, result, iter=iter, rng=np.random.default_rng(seed)
+        )
+    game = Game.__new__(Game)
+    rng = BufferedRandom(seed)
+    for i in range(iter):
+        if dice is not None:
+            rng = dice.stream(start + i)
+        if kind == "turn":
+            result.add(*game.sim_turn(camel_dict, tiles_dict, rng=rng))
+        else:
+            result.add(game.sim_game(camel_dict, tiles_dict, rng=rng))
+    return result
+
 
 class Game:
     """
     base class - doesn't initalize anything
     """
 
-    def __init__(self, num_players):
+    def __init__(self, num_players, rng=None):
         self.num_players = num_players
+        self.rng = BufferedRandom() if rng is None else rng
         self.tiles_dict = dict()
         self.camel_dict = dict()
         self._gen_camel_dict()
@@ -35,6 +126,7 @@ class Game:
         self.winner_bets = []
         self.loser_bets = []
         self.state = 1
+        self.rehash()
 
     def _gen_camel_dict(self):
         """Generates base camel dictionary
@@ -72,8 +164,8 @@ class Game:
             if self.camel_dict[key]["space"] is None
         ]
         while need_place:
-            camel = random.choice(need_place)
-            roll = random.randint(1, 3)
+            camel = self.rng.choice(need_place)
+            roll = self.rng.randint(1, 3)
             self.camel_dict[camel]["space"] = 0
             self.camel_dict[camel]["height"] = 0
             gameplay.move(self.camel_dict, self.tiles_dict, camel, roll)
@@ -83,6 +175,226 @@ class Game:
                 if self.camel_dict[key]["space"] is None
             ]
 
+    def __getattr__(self, name):
+        """Unpacks the dicts of a copy the first time one of them is read"""
+        packed = self.__dict__.get("_packed")
+        if packed is None or name not in PACKED_FIELDS:
+            raise AttributeError(name)
+        del self.__dict__["_packed"]
+        unpacked = dict(
+            camel_dict=packed.camel_items(),
+            player_dict=packed.player_items(),
+            bet_tiles=packed.bet_tile_items(),
+            tiles_dict=packed.tile_items(),
+        )
+        unpacked["winner_bets"], unpacked["loser_bets"] = packed.bet_items()
+        for field, value in unpacked.items():
+            self.__dict__.setdefault(field, value)
+        return self.__dict__[name]
+
+    def _packed_state(self):
+        """
+        Packed state of a copy whose dicts were never unpacked or assigned, None
+        otherwise
+        """
+        packed = self.__dict__.get("_packed")
+        if packed is None or any(field in self.__dict__ for field in PACKED_FIELDS):
+            return None
+        packed = packed.copy()
+        packed.buffer[-1] = self.state
+        return packed
+
+    def get_state(self):
+        """Compact snapshot of the game
+
+        Returns
+        -------
+        GameState
+            Packed state of the game
+        """
+        packed = self._packed_state()
+        if packed is not None:
+            return packed
+        return GameState.from_game(self)
+
+    def set_state(self, state):
+        """Restores the game from a snapshot
+
+        Parameters
+        ----------
+        state : GameState
+            Packed state to restore
+        """
+        self.__dict__.pop("_packed", None)
+        self.num_players = state.num_players
+        self.camel_dict = state.camel_items()
+        self.player_dict = state.player_items()
+        self.bet_tiles = state.bet_tile_items()
+        self.tiles_dict = state.tile_items()
+        self.winner_bets, self.loser_bets = state.bet_items()
+        self.state = state.state
+        self.rehash()
+
+    def rehash(self):
+        """Recomputes `position_key`, the Zobrist hash of the camels and tiles
+
+        Moves played through the game keep the key up to date, code that assigns
+        or edits `camel_dict` or `tiles_dict` directly has to call this. The
+        search keys `treesearch.CACHE` on the key, it starts from a `copy`, which
+        rehashes unless it copies a buffer that was never unpacked
+        """
+        self.position_key = zobrist.position_hash(self.camel_dict, self.tiles_dict)
+
+    @classmethod
+    def from_state(cls, state, rng=None):
+        """Creates a game from a snapshot
+
+        Parameters
+        ----------
+        state : GameState
+            Packed state of the game
+        rng : BufferedRandom
+            Random generator of the game, a fresh one is created when None
+
+        Returns
+        -------
+        Game
+            Game in the packed state
+        """
+        game = cls.__new__(cls)
+        game.rng = BufferedRandom() if rng is None else rng
+        game.set_state(state)
+        return game
+
+    def copy(self):
+        """Copy of the game, the copy draws from the same random generator
+
+        The copy holds only the packed state, its dicts are unpacked the first
+        time one of them is read. Copying a copy that was never unpacked is a
+        single buffer copy, any other game is packed first.
+
+        Returns
+        -------
+        Game
+            Copied game
+        """
+        game = Game.__new__(Game)
+        game.rng = self.rng
+        game.num_players = self.num_players
+        game.state = self.state
+        packed = self._packed_state()
+        if packed is None:
+            packed = GameState.from_game(self)
+            game.position_key = zobrist.position_hash(self.camel_dict, self.tiles_dict)
+        else:
+            game.position_key = self.position_key
+        game._packed = packed
+        return game
+
+    def make(self, move):
+        """Plays a move in place, keeping what is needed to take it back
+
+        Only what the move can touch is recorded: the player's cards for a card,
+        the camel's bet tiles for a bet tile, the space and the player's tile for
+        a tile, and the camels and coins for a roll, along with the tiles and bet
+        tiles when the roll ends the leg.
+
+        Parameters
+        ----------
+        move : Move
+            The move to play, see `play`
+
+        Returns
+        -------
+        tuple
+            Output of `play` and the `Undo` record to pass to `unmake`
+        """
+        player = self.player_dict[self.state]
+        if move.kind == "roll":
+            leg = None
+            if sum(val["need_roll"] for val in self.camel_dict.values()) == 1:
+                # `end_round` replaces the tiles and the players' bet tiles and
+                # refills the bet tiles in place
+                leg = (
+                    self.tiles_dict,
+                    tuple(
+                        (val["tile"], val["bet_tiles"])
+                        for val in self.player_dict.values()
+                    ),
+                    dict(self.bet_tiles),
+                )
+            delta = (
+                tuple(
+                    (val["space"], val["height"], val["need_roll"])
+                    for val in self.camel_dict.values()
+                ),
+                tuple(val["coins"] for val in self.player_dict.values()),
+                leg,
+            )
+        elif move.kind == "bet_tile":
+            delta = (
+                move.camel,
+                tuple(self.bet_tiles.get(move.camel, ())),
+                tuple(player["bet_tiles"].get(move.camel, ())),
+            )
+        elif move.kind == "tile":
+            delta = (move.space, self.tiles_dict.get(move.space), player["tile"])
+        else:
+            delta = tuple(player["game_cards"])
+        undo = Undo(move.kind, delta, self.state, self.position_key)
+        return self.play(move), undo
+
+    def unmake(self, undo):
+        """Takes back a move played with `make`
+
+        Parameters
+        ----------
+        undo : Undo
+            Record returned by `make`
+        """
+        player = self.player_dict[undo.state]
+        if undo.kind == "roll":
+            camels, coins, leg = undo.delta
+            for val, (space, height, need_roll) in zip(
+                self.camel_dict.values(), camels
+            ):
+                val["space"] = space
+                val["height"] = height
+                val["need_roll"] = need_roll
+            for val, points in zip(self.player_dict.values(), coins):
+                val["coins"] = points
+            if leg is not None:
+                self.tiles_dict, players, self.bet_tiles = leg
+                for val, (tile, bet_tiles) in zip(self.player_dict.values(), players):
+                    val["tile"] = tile
+                    val["bet_tiles"] = bet_tiles
+        elif undo.kind == "bet_tile":
+            camel, tiles, bets = undo.delta
+            if camel not in self.bet_tiles:
+                self.bet_tiles = {
+                    key: self.bet_tiles.get(key, list(tiles))
+                    for key in config.CAMELS
+                    if key in self.bet_tiles or key == camel
+                }
+            self.bet_tiles[camel] = list(tiles)
+            if bets:
+                player["bet_tiles"][camel] = list(bets)
+            else:
+                player["bet_tiles"].pop(camel, None)
+        elif undo.kind == "tile":
+            space, tile, has_tile = undo.delta
+            if tile is None:
+                del self.tiles_dict[space]
+            else:
+                self.tiles_dict[space] = tile
+            player["tile"] = has_tile
+        else:
+            player["game_cards"] = list(undo.delta)
+            bets = self.winner_bets if undo.kind == "winner_card" else self.loser_bets
+            del bets[-1]
+        self.state = undo.state
+        self.position_key = undo.position_key
+
     def end_game(self):
         """Ends the game
         1. Scores the round
@@ -125,6 +437,7 @@ class Game:
         for val in self.camel_dict.values():
             val["need_roll"] = True
         self.tiles_dict = dict()
+        self.rehash()
         for val in self.player_dict.values():
             val["tile"] = True
             val["bet_tiles"] = dict()
@@ -145,31 +458,120 @@ class Game:
                 else:
                     self.player_dict[player]["coins"] -= np.size(val)
 
-    def available_moves(self):
-        """Computes all the moves that are available.
+    def legal_moves(self, pruned=False):
+        """Computes the moves that are available as `Move` records
+
+        Roll moves leave the camel and die to be filled in with `_replace`.
+
+        Parameters
+        ----------
+        pruned : bool
+            Only keep the moves that make sense, see `available_moves_pruned`
 
         Returns
         -------
         list
             Moves available to play
         """
-        moves = dict()
-        moves["Roll"] = "self.play_roll(camel, roll)"
-        for camel in self.bet_tiles:
-            moves[
-                f"Bet Round Winner {camel} - {self.bet_tiles[camel][0]} Points"
-            ] = f"self.play_bet_tile('{camel}')"
-        for card in self.player_dict[self.state]["game_cards"]:
-            moves[f"Bet Game Winner {card}"] = f"self.play_winner_card('{card}')"
-        for card in self.player_dict[self.state]["game_cards"]:
-            moves[f"Bet Game Loser {card}"] = f"self.play_loser_card('{card}')"
-        if self.player_dict[self.state]["tile"]:
-            for spot in self.available_tile_placements():
-                moves[
-                    f"Place Block Tile At {spot}"
-                ] = f"self.play_tile('block', {spot})"
-                moves[f"Place Skip Tile At {spot}"] = f"self.play_tile('skip', {spot})"
-        return moves
+        player = self.player_dict[self.state]
+        tiles = []
+        if player["tile"]:
+            if pruned:
+                spots = self.available_tile_placements_pruned()
+            else:
+                spots = self.available_tile_placements()
+            for spot in spots:
+                tiles.append(Move("tile", space=spot, tile_type="block"))
+                tiles.append(Move("tile", space=spot, tile_type="skip"))
+        if not pruned:
+            return (
+                [Move("roll")]
+                + [Move("bet_tile", camel) for camel in self.bet_tiles]
+                + [Move("winner_card", card) for card in player["game_cards"]]
+                + [Move("loser_card", card) for card in player["game_cards"]]
+                + tiles
+            )
+        order = [*self._winner(self.camel_dict).keys()]
+        return (
+            [
+                Move("winner_card", card)
+                for card in player["game_cards"]
+                if card in order[:2]
+            ]
+            + [
+                Move("loser_card", card)
+                for card in player["game_cards"]
+                if card in order[-2:]
+            ]
+            + [
+                Move("bet_tile", camel)
+                for camel in self.bet_tiles
+                if camel in order[0:3]
+            ]
+            + [Move("roll")]
+            + tiles
+        )
+
+    def move_label(self, move):
+        """Display string of a move
+
+        Parameters
+        ----------
+        move : Move
+            Move to describe
+
+        Returns
+        -------
+        str
+            Label of the move for the UI
+        """
+        if move.kind == "roll":
+            return "Roll"
+        if move.kind == "bet_tile":
+            points = self.bet_tiles[move.camel][0]
+            return f"Bet Round Winner {move.camel} - {points} Points"
+        if move.kind == "winner_card":
+            return f"Bet Game Winner {move.camel}"
+        if move.kind == "loser_card":
+            return f"Bet Game Loser {move.camel}"
+        return f"Place {move.tile_type.title()} Tile At {move.space}"
+
+    def move_array(self, pruned=False):
+        """Computes the moves that are available as a numpy array
+
+        Parameters
+        ----------
+        pruned : bool
+            Only keep the moves that make sense, see `available_moves_pruned`
+
+        Returns
+        -------
+        array
+            Numpy structured array of `MOVE_DTYPE`, camels are indices into
+            `config.CAMELS` and -1 marks an unused field
+        """
+        return np.array(
+            [
+                (
+                    MOVE_KINDS.index(move.kind),
+                    -1 if move.camel is None else config.CAMELS.index(move.camel),
+                    -1 if move.space is None else move.space,
+                    -1 if move.tile_type is None else TILE_TYPES.index(move.tile_type),
+                )
+                for move in self.legal_moves(pruned)
+            ],
+            dtype=MOVE_DTYPE,
+        )
+
+    def available_moves(self):
+        """Computes all the moves that are available.
+
+        Returns
+        -------
+        dict
+            Moves available to play keyed by their label
+        """
+        return {self.move_label(move): move for move in self.legal_moves()}
 
     def available_moves_pruned(self):
         """Computes all the moves that are available, pruned for only moves that make sense.
@@ -180,30 +582,10 @@ class Game:
 
         Returns
         -------
-        list
-            Moves available to play
+        dict
+            Moves available to play keyed by their label
         """
-        moves = dict()
-        order = [*self._winner(self.camel_dict).keys()]
-        for card in self.player_dict[self.state]["game_cards"]:
-            if card in order[:2]:
-                moves[f"Bet Game Winner {card}"] = f"self.play_winner_card('{card}')"
-        for card in self.player_dict[self.state]["game_cards"]:
-            if card in order[-2:]:
-                moves[f"Bet Game Loser {card}"] = f"self.play_loser_card('{card}')"
-        for camel in self.bet_tiles:
-            if camel in order[0:3]:
-                moves[
-                    f"Bet Round Winner {camel} - {self.bet_tiles[camel][0]} Points"
-                ] = f"self.play_bet_tile('{camel}')"
-        moves["Roll"] = "self.play_roll(camel, roll)"
-        if self.player_dict[self.state]["tile"]:
-            for spot in self.available_tile_placements_pruned():
-                moves[
-                    f"Place Block Tile At {spot}"
-                ] = f"self.play_tile('block', {spot})"
-                moves[f"Place Skip Tile At {spot}"] = f"self.play_tile('skip', {spot})"
-        return moves
+        return {self.move_label(move): move for move in self.legal_moves(pruned=True)}
 
     def available_tile_placements(self):
         """Compute the available tiles
@@ -214,18 +596,7 @@ class Game:
             List of available spaces of tiles
 
         """
-        blocked = []
-        for tile in self.tiles_dict.keys():
-            blocked.append(tile)
-            blocked.append(tile + 1)
-            blocked.append(tile - 1)
-        for camel in self.camel_dict.values():
-            blocked.append(camel["space"])
-        spots = list(range(1, 17))
-        spaces = [
-            spot for spot in spots if (spot not in blocked) & (spot > min(blocked))
-        ]
-        return spaces
+        return gameplay.Board(self.camel_dict, self.tiles_dict).tile_placements()
 
     def available_tile_placements_pruned(self):
         """Compute the available tiles
@@ -236,22 +607,9 @@ class Game:
             List of available spaces of tiles
 
         """
-        blocked = []
-        for tile in self.tiles_dict.keys():
-            blocked.append(tile)
-            blocked.append(tile + 1)
-            blocked.append(tile - 1)
-        for camel in self.camel_dict.values():
-            blocked.append(camel["space"])
-        spots = list(range(1, 17))
-        spaces = [
-            spot
-            for spot in spots
-            if (spot not in blocked)
-            & (spot > min(blocked))
-            & (spot <= max(blocked) + 3)
-        ]
-        return spaces
+        return gameplay.Board(self.camel_dict, self.tiles_dict).tile_placements(
+            pruned=True
+        )
 
     def play(self, move):
         """
@@ -260,10 +618,14 @@ class Game:
 
         Parameters
         ----------
-        move : 'str'
-            The move to play, formatted as a function
+        move : Move
+            The move to play, strings formatted as a function are still
+            evaluated
         """
-        output = eval(move)
+        if isinstance(move, str):
+            output = eval(move)
+        else:
+            output = PLAYS[move.kind](self, move)
         self.state += 1
         if self.state > self.num_players:
             self.state = 1
@@ -281,6 +643,7 @@ class Game:
         """
         self.player_dict[self.state]["tile"] = False
         self.tiles_dict[space] = {"tile_type": tile_type, "player": self.state}
+        self.position_key ^= zobrist.tile_key(space, self.tiles_dict[space])
 
     def play_winner_card(self, camel):
         """Play a winner card
@@ -335,12 +698,26 @@ class Game:
         roll : int
             The number that is rolled
         """
+        before = [
+            (key, val["space"], val["height"], val["need_roll"])
+            for key, val in self.camel_dict.items()
+        ]
         give_points = gameplay.move(self.camel_dict, self.tiles_dict, camel, roll)
         if give_points:
             tile_owner = self.tiles_dict[give_points]["player"]
             self.player_dict[tile_owner]["coins"] += 1
         self.player_dict[self.state]["coins"] += 1
         self.camel_dict[camel]["need_roll"] = False
+        for key, space, height, need_roll in before:
+            val = self.camel_dict[key]
+            if (space, height, need_roll) != (
+                val["space"],
+                val["height"],
+                val["need_roll"],
+            ):
+                old = {"space": space, "height": height, "need_roll": need_roll}
+                self.position_key ^= zobrist.camel_key(key, old)
+                self.position_key ^= zobrist.camel_key(key, val)
         if self.camel_dict[camel]["space"] > 16:
             return self.end_game()
         if any([val["need_roll"] for val in self.camel_dict.values()]) is False:
@@ -360,35 +737,41 @@ class Game:
             )
         }
 
-    def _turn(self, sim_dict, tiles):
+    def _turn(self, sim_dict, tiles, rng=None):
         """
-        Simulates a single turn
+        Simulates a single turn, `rng` has the `choice` and `randint` of the
+        `random` module and defaults to the game's generator
         """
+        if rng is None:
+            rng = self.rng
         need_roll = [key for key in sim_dict.keys() if sim_dict[key]["need_roll"]]
         tile_points = dict()
+        board = gameplay.Board(sim_dict, tiles)
         while need_roll:
-            camel = random.choice(need_roll)
-            roll = random.randint(1, 3)
+            camel = rng.choice(need_roll)
+            roll = rng.randint(1, 3)
             logger.info("The {0} camel rolled {1}".format(camel, roll))
-            give_points = gameplay.move(sim_dict, tiles, camel, roll)
+            give_points = board.move(camel, roll)
             if give_points:
                 tile_owner = tiles[give_points]["player"]
                 util.add_value_dict(tile_points, tile_owner, 1)
             sim_dict[camel]["need_roll"] = False
             need_roll.remove(camel)
-            if sim_dict[camel]["space"] > 16:
+            if board.spaces[camel] > 16:
+                board.update(sim_dict)
                 return self._winner(sim_dict), tile_points
+        board.update(sim_dict)
         return None, tile_points
 
-    def sim_turn(self, camel_dict, tiles):
+    def sim_turn(self, camel_dict, tiles, rng=None):
         """
         Simulates a single turn
         """
         sim_dict = deepcopy(camel_dict)
-        tile_points = self._turn(sim_dict, tiles)[1]
+        tile_points = self._turn(sim_dict, tiles, rng)[1]
         return self._winner(sim_dict), tile_points
 
-    def sim_game(self, camel_dict, tiles):
+    def sim_game(self, camel_dict, tiles, rng=None):
         """
         Simulates a single game
         """
@@ -396,33 +779,353 @@ class Game:
         sim_dict = deepcopy(camel_dict)
         finished = None
         while finished is None:
-            finished = self._turn(sim_dict, sim_tiles)[0]
+            finished = self._turn(sim_dict, sim_tiles, rng)[0]
             for key, value in sim_dict.items():
                 value["need_roll"] = True
             sim_tiles = {}
         return finished
 
-    def turn_monte(self, camel_dict, tiles_dict, iter=1000):
+    def monte_counts(
+        self,
+        kind,
+        camel_dict,
+        tiles_dict,
+        iter=1000,
+        workers=None,
+        seed=None,
+        vectorized=False,
+        precision=None,
+        batch_size=None,
+        dice=None,
+        counts=None,
+    ):
+        """Runs monte carlo in chunks of `CHUNK_SIZE` (`VECTOR_CHUNK_SIZE` for the
+        vectorized engine) and merges their counts
+
+        Every chunk gets its own random stream spawned from `seed`, so the merged
+        counts for a seed are the same whatever the number of workers.
+
+        With a `precision` the simulations run in batches until the 95% confidence
+        interval half-width of every camel's probability of placing first and
+        second (last for the game) is within `precision`, `iter` becomes the cap.
+
+        Parameters
+        ----------
+        kind : str
+            Either `turn` or `game`
+        camel_dict : nested dict
+            Dictionary with current camel positions
+        tiles_dict : dict
+            Dictonary with tiles information
+        iter : int
+            Number of simulations, the most to run when `precision` is given
+        workers : int
+            Number of processes to spread the chunks over, None runs them here
+        seed : int
+            Seed of the random streams, None for fresh entropy
+        vectorized : bool
+            Simulate games with the vectorized engine
+        precision : float
+            Target confidence interval half-width, None to run all of `iter`
+        batch_size : int
+            Simulations between precision checks, defaults to `BATCH_SIZE` or
+            `VECTOR_BATCH_SIZE`
+        dice : DiceBlock
+            Common dice, simulation `i` rolls `dice.stream(i)` so positions run
+            with the same block are compared on the same dice, runs the python
+            engine even when `vectorized`
+        counts : RaceCounts
+            Counts of earlier simulations of the position to add to until they
+            hold `iter`. The dice carry on where they stopped and the chunks get
+            the streams after the `streams` already spawned for the counts, so
+            they never reuse one. The merged counts match a single run of the
+            same seed when the earlier runs stopped on whole chunks
+
+        Returns
+        -------
+        RaceCounts
+            Counts of the places and tile points over all the simulations
+        """
+        if dice is not None:
+            vectorized = False
+            dice.draw(iter)
+        chunk_size = VECTOR_CHUNK_SIZE if vectorized else CHUNK_SIZE
+        if batch_size is None:
+            batch_size = VECTOR_BATCH_SIZE if vectorized else BATCH_SIZE
+        if precision is None:
+            batch_size = iter
+        watch = [[1], [2] if kind == "turn" else [len(camel_dict)]]
+        if counts is None:
+            counts = RaceCounts(camel_dict)
+        sequence = np.random.SeedSequence(seed, n_children_spawned=counts.streams)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+        try:
+            while counts.n < iter:
+                size = min(batch_size, iter - counts.n)
+                sizes = [chunk_size] * (size // chunk_size)
+                if size % chunk_size:
+                    sizes.append(size % chunk_size)
+                seeds = sequence.spawn(len(sizes))
+                counts.streams += len(sizes)
+                starts = np.cumsum([counts.n] + sizes[:-1])
+                args = [
+                    (
+                        kind,
+                        camel_dict,
+                        tiles_dict,
+                        chunk,
+                        chunk_seed,
+                        vectorized,
+                        dice,
+                        int(start),
+                    )
+                    for chunk, chunk_seed, start in zip(sizes, seeds, starts)
+                ]
+                if executor:
+                    results = list(executor.map(_monte_chunk, *zip(*args)))
+                else:
+                    results = [_monte_chunk(*arg) for arg in args]
+                for result in results:
+                    counts.merge(result)
+                if precision is not None and counts.half_width(watch) <= precision:
+                    break
+        finally:
+            if executor:
+                executor.shutdown()
+        logger.info(f"Monte Carlo {kind}: {counts.n} simulations")
+        return counts
+
+    def turn_monte(self, camel_dict, tiles_dict, iter=1000, workers=None, seed=None):
+        """
+        Runs monte carlo for the turn, see `monte_counts` for `workers` and `seed`
+        """
+        counts = self.monte_counts("turn", camel_dict, tiles_dict, iter, workers, seed)
+        return (
+            counts.rows(),
+            counts.tile_points_array()[["player", "points"]],
+        )
+
+    def leg_outcomes(self, camel_dict, tiles_dict):
+        """Enumerates every way the current leg can play out
+
+        Outcomes that reach the same camel positions are merged, so the number of
+        branches stays far below the 5! * 3^5 roll sequences of a full leg.
+
+        Parameters
+        ----------
+        camel_dict : nested dict
+            Dictionary with current camel positions
+        tiles_dict : dict
+            Dictonary with tiles information
+
+        Returns
+        -------
+        list
+            Tuples of (camel_dict, probability, weighted tile points) for the end of
+            the leg. The tile points are weighted by the outcome probability.
+        """
+        need_roll = tuple(key for key in camel_dict if camel_dict[key]["need_roll"])
+        frontier = {
+            None: (gameplay.Board(camel_dict, tiles_dict), need_roll, 1.0, dict())
+        }
+        outcomes = []
+        while frontier:
+            next_frontier = dict()
+            for board, need_roll, prob, tile_points in frontier.values():
+                if not need_roll:
+                    outcomes.append((board, need_roll, prob, tile_points))
+                    continue
+                branch_prob = prob / (len(need_roll) * 3)
+                for camel in need_roll:
+                    rest = tuple(key for key in need_roll if key != camel)
+                    for roll in range(1, 4):
+                        branch = board.copy()
+                        branch_points = {
+                            key: val / (len(need_roll) * 3)
+                            for key, val in tile_points.items()
+                        }
+                        give_points = branch.move(camel, roll)
+                        if give_points:
+                            tile_owner = tiles_dict[give_points]["player"]
+                            util.add_value_dict(branch_points, tile_owner, branch_prob)
+                        if branch.spaces[camel] > 16:
+                            outcomes.append((branch, rest, branch_prob, branch_points))
+                            continue
+                        key = (
+                            tuple(
+                                (space, *stack)
+                                for space, stack in sorted(branch.stacks.items())
+                            ),
+                            rest,
+                        )
+                        if key in next_frontier:
+                            _, _, merged_prob, merged_points = next_frontier[key]
+                            for player, points in branch_points.items():
+                                util.add_value_dict(merged_points, player, points)
+                            next_frontier[key] = (
+                                branch,
+                                rest,
+                                merged_prob + branch_prob,
+                                merged_points,
+                            )
+                        else:
+                            next_frontier[key] = (
+                                branch,
+                                rest,
+                                branch_prob,
+                                branch_points,
+                            )
+            frontier = next_frontier
+        results = []
+        for board, need_roll, prob, tile_points in outcomes:
+            sim_dict = {
+                key: dict(val, need_roll=key in need_roll)
+                for key, val in camel_dict.items()
+            }
+            board.update(sim_dict)
+            results.append((sim_dict, prob, tile_points))
+        return results
+
+    def game_stratified(self, camel_dict, tiles_dict, iter=1000, rng=None):
+        """Game probabilities with the current leg enumerated exactly
+
+        Every end of leg state from `leg_outcomes` is a stratum. Races that
+        finish during the leg are counted with their exact weight and only the
+        later legs are simulated, vectorized with `simulation.simulate`. Half of
+        `iter` is spread over the strata in proportion to their weight, the other
+        half in proportion to weight times the standard deviation of the first
+        and last place indicators seen so far (Neyman allocation). Fractional
+        allocations are rounded by systematic sampling and every sample is
+        weighted by its stratum weight over its expected allocation, so the
+        estimate stays unbiased whichever strata go unsampled.
+
+        Parameters
+        ----------
+        camel_dict : nested dict
+            Dictionary with current camel positions
+        tiles_dict : dict
+            Dictonary with tiles information
+        iter : int
+            Number of later legs to simulate
+        rng : numpy Generator
+            Random generator, the generator behind the game's `rng` when None
+
+        Returns
+        -------
+        RaceCounts
+            Weighted counts, scaled so that they sum to `iter` races
+        """
+        if rng is None:
+            rng = self.rng.generator
+        counts = RaceCounts(camel_dict)
+        num_camels = len(counts.camels)
+        prob = np.zeros((num_camels, num_camels))
+        strata = []
+        weights = []
+        for sim_dict, weight, _ in self.leg_outcomes(camel_dict, tiles_dict):
+            if any(val["space"] > 16 for val in sim_dict.values()):
+                for camel, place in self._winner(sim_dict).items():
+                    prob[counts.index[camel], place - 1] += weight
+            else:
+                strata.append(sim_dict)
+                weights.append(weight)
+        if strata and iter:
+            weights = np.array(weights)
+            start = [
+                simulation.camels_to_arrays(sim_dict, counts.camels)[:2]
+                for sim_dict in strata
+            ]
+            space = np.array([row[0] for row in start])
+            height = np.array([row[1] for row in start])
+            no_tiles = np.zeros(simulation.BOARD_SIZE, dtype=np.int64)
+            sums = np.zeros((len(strata), num_camels, num_camels))
+            seen = np.zeros(len(strata))
+            estimate = np.zeros((num_camels, num_camels))
+            for phase, size in enumerate([iter - iter // 2, iter // 2]):
+                if phase == 0:
+                    alloc = weights
+                else:
+                    first = (sums[:, :, 0] + 0.5) / (seen[:, None] + 1)
+                    last = (sums[:, :, -1] + 0.5) / (seen[:, None] + 1)
+                    spread = np.sqrt(
+                        (first * (1 - first) + last * (1 - last)).sum(axis=1)
+                    )
+                    spread[seen == 0] = spread[seen > 0].mean()
+                    alloc = weights * spread
+                expected = size * alloc / alloc.sum()
+                base = np.floor(expected)
+                edges = np.concatenate([[0], np.cumsum(expected - base)])
+                extra = np.diff(np.ceil(edges - rng.random()))
+                samples = (base + extra).astype(np.int64)
+                stratum = np.repeat(np.arange(len(strata)), samples)
+                phase_space = space[stratum]
+                phase_height = height[stratum]
+                simulation.simulate(
+                    phase_space,
+                    phase_height,
+                    np.ones(phase_space.shape, dtype=bool),
+                    no_tiles,
+                    no_tiles,
+                    rng,
+                )
+                place = simulation.places(phase_space, phase_height)
+                phase_sums = np.zeros_like(sums)
+                np.add.at(
+                    phase_sums,
+                    (stratum[:, None], np.arange(num_camels)[None, :], place - 1),
+                    1,
+                )
+                sums += phase_sums
+                seen += samples
+                scale = np.divide(
+                    weights, expected, out=np.zeros_like(weights), where=expected > 0
+                )
+                estimate += size * (phase_sums * scale[:, None, None]).sum(axis=0)
+            prob += estimate / iter
+        counts.places = prob * iter
+        counts.n = iter
+        return counts
+
+    def turn_exact(self, camel_dict, tiles_dict):
         """
-        Runs monte carlo for the turn
+        Computes the exact distribution of the turn, alternative to `turn_monte`
+
+        Returns
+        -------
+        tuple of arrays
+            Probability of each (camel, place) and the expected tile points of each
+            player
         """
-        winner, tile_points = self.sim_turn(camel_dict, tiles_dict)
-        winner_result = [*winner.items()]
-        tile_points_result = [*tile_points.items()]
-        for i in range(iter - 1):
-            winner, tile_points = self.sim_turn(camel_dict, tiles_dict)
-            winner_result.extend([*winner.items()])
-            tile_points_result.extend([*tile_points.items()])
+        places = dict()
+        tile_points = dict()
+        for sim_dict, prob, points in self.leg_outcomes(camel_dict, tiles_dict):
+            for camel, place in self._winner(sim_dict).items():
+                util.add_value_dict(places, (camel, place), prob)
+            for player, val in points.items():
+                util.add_value_dict(tile_points, player, val)
         return (
-            np.array(winner_result, dtype=[("camel", "U6"), ("place", float)]),
-            np.array(tile_points_result, dtype=[("player", float), ("points", float)]),
+            np.array(
+                [(camel, place, prob) for (camel, place), prob in places.items()],
+                dtype=[("camel", "U6"), ("place", float), ("prob", float)],
+            ),
+            np.array(
+                [*tile_points.items()], dtype=[("player", float), ("points", float)]
+            ),
         )
 
-    def game_monte(self, camel_dict, tiles_dict, iter=1000):
+    def game_monte(
+        self,
+        camel_dict,
+        tiles_dict,
+        iter=1000,
+        vectorized=False,
+        workers=None,
+        seed=None,
+    ):
         """
-        Runs monte carlo for the turn
+        Runs monte carlo for the game, `vectorized` runs the games together with
+        `simulation.game_counts`, see `monte_counts` for `workers` and `seed`
         """
-        result = [*self.sim_game(camel_dict, tiles_dict).items()]
-        for i in range(iter - 1):
-            result.extend([*self.sim_game(camel_dict, tiles_dict).items()])
-        return np.array(result, dtype=[("camel", "U6"), ("place", float)])
+        return self.monte_counts(
+            "game", camel_dict, tiles_dict, iter, workers, seed, vectorized
+        ).rows()
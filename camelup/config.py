@@ -12,3 +12,5 @@ COINS = 5
 BET_POINTS = [8, 5, 3, 2]
 
 BET_SCALING = [8, 7, 6, 5, 5, 4, 4, 4, 3, 3, 3, 2, 2, 2, 2, 2, 2]
+
+ENGINE = "treesearch"
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""Module with the monte carlo counts accumulator
+
+`RaceCounts` keeps a camel by place count matrix and the tile points of each
+player, so its memory stays the same however many races are fed into it.
+"""
+
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class RaceCounts:
+    """Counts of where each camel placed over a number of races
+
+    Attributes
+    ----------
+    camels : tuple
+        Names of the camels, the rows of `places`
+    places : array
+        Number of races each camel finished in each place, place 1 is column 0
+    tile_points : dict
+        Total tile points given to each player
+    n : int
+        Number of races counted
+    streams : int
+        Number of random streams spawned for the races, see `Game.monte_counts`
+    """
+
+    __slots__ = ("camels", "index", "places", "tile_points", "n", "streams")
+
+    def __init__(self, camels):
+        self.camels = tuple(camels)
+        self.index = {camel: index for index, camel in enumerate(self.camels)}
+        self.places = np.zeros((len(self.camels), len(self.camels)), dtype=np.int64)
+        self.tile_points = dict()
+        self.n = 0
+        self.streams = 0
+
+    def add(self, winner, tile_points=None):
+        """Counts a single race
+
+        Parameters
+        ----------
+        winner : dict
+            Place of each camel, as returned by `Game._winner`
+        tile_points : dict
+            Tile points given to each player during the race
+        """
+        for camel, place in winner.items():
+            self.places[self.index[camel], place - 1] += 1
+        if tile_points:
+            for player, points in tile_points.items():
+                self.tile_points[player] = self.tile_points.get(player, 0) + points
+        self.n += 1
+
+    def add_places(self, place, tile_points=None):
+        """Counts a batch of races
+
+        Parameters
+        ----------
+        place : array
+            Place of each camel, one row per race and one column per camel in the
+            order of `camels`
+        tile_points : array
+            Tile points given to each player, one row per race and one column per
+            player number
+        """
+        num_camels = len(self.camels)
+        cells = np.arange(num_camels) * num_camels + place - 1
+        self.places += np.bincount(
+            cells.ravel(), minlength=num_camels * num_camels
+        ).reshape(num_camels, num_camels)
+        if tile_points is not None:
+            for player, points in enumerate(tile_points.sum(axis=0)):
+                if points:
+                    self.tile_points[player] = (
+                        self.tile_points.get(player, 0) + points.item()
+                    )
+        self.n += place.shape[0]
+
+    def merge(self, other):
+        """Adds the counts of another accumulator
+
+        Parameters
+        ----------
+        other : RaceCounts
+            Counts over the same camels
+
+        Returns
+        -------
+        RaceCounts
+            Itself, with the counts of both
+        """
+        self.places += other.places[[other.index[camel] for camel in self.camels]]
+        for player, points in other.tile_points.items():
+            self.tile_points[player] = self.tile_points.get(player, 0) + points
+        self.n += other.n
+        return self
+
+    def snapshot(self):
+        """Copy of the counts so far
+
+        Returns
+        -------
+        RaceCounts
+            Copied counts
+        """
+        counts = RaceCounts(self.camels)
+        counts.places = self.places.copy()
+        counts.tile_points = dict(self.tile_points)
+        counts.n = self.n
+        counts.streams = self.streams
+        return counts
+
+    def prob_array(self, places):
+        """Probability of each camel finishing in any of the places
+
+        Parameters
+        ----------
+        places : iterable
+            Places to count, 1 is the leader
+
+        Returns
+        -------
+        array
+            Numpy structured array with the counts and probability of each camel,
+            same layout as `treesearch.create_prob_array`
+        """
+        columns = [place - 1 for place in places]
+        counts = self.places[:, columns].sum(axis=1).astype(float)
+        return np.array(
+            [*zip(self.camels, counts, counts / max(self.n, 1))],
+            dtype=[("camel", "U6"), ("counts", float), ("prob", float)],
+        )
+
+    def half_width(self, groups, z=1.96):
+        """Widest normal confidence interval half-width of the probabilities
+
+        Parameters
+        ----------
+        groups : list of iterables
+            Places to check, each group is checked as in `prob_array`
+        z : float
+            Normal quantile of the interval, 1.96 for 95%
+
+        Returns
+        -------
+        float
+            Largest half-width over the camels and groups, inf before any race
+        """
+        if not self.n:
+            return float("inf")
+        prob = np.array([self.prob_array(places)["prob"] for places in groups])
+        return float(z * np.sqrt(prob * (1 - prob) / self.n).max())
+
+    def tile_points_array(self):
+        """Expected tile points of each player
+
+        Returns
+        -------
+        array
+            Numpy structured array with the total and expected points
+        """
+        return np.array(
+            [
+                (player, points, points / max(self.n, 1))
+                for player, points in sorted(self.tile_points.items())
+            ],
+            dtype=[("player", float), ("points", float), ("exp_points", float)],
+        )
+
+    def rows(self):
+        """Expands the counts to one row per camel per race
+
+        Returns
+        -------
+        array
+            Numpy structured array with the place of every camel in every race
+        """
+        camel, place = np.nonzero(self.places)
+        return np.array(
+            [*zip(np.array(self.camels)[camel], place + 1.0)],
+            dtype=[("camel", "U6"), ("place", float)],
+        ).repeat(self.places[camel, place])
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""Module with the dice used by the game and the monte carlo
+
+`BufferedRandom` draws dice, uniforms and camel orders from a numpy generator in
+large blocks so each game or search owns its random state. A `DiceBlock` draws,
+for every simulation index, the order the camels roll in and the die each camel
+gets in each leg. Positions simulated with the same block see the same dice, so
+the difference between two moves isn't swamped by sampling noise.
+"""
+
+import logging
+import random
+
+import numpy as np
+
+import camelup.config as config
+import camelup.simulation as simulation
+
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 4096
+
+LEGS = simulation.FINISH + 1
+
+BLOCK_ROWS = 1024
+
+CAMEL_INDEX = {camel: index for index, camel in enumerate(config.CAMELS)}
+
+
+class BufferedRandom:
+    """Random generator with the `random` module's `choice` and `randint`
+
+    Values are drawn from a numpy generator `size` at a time and handed out from
+    python lists, which is much cheaper per die than the `random` module and
+    keeps every game or search on its own stream.
+
+    Parameters
+    ----------
+    seed : int or np.random.SeedSequence
+        Seed of the generator, None for fresh entropy
+    size : int
+        Number of values drawn per block
+
+    Attributes
+    ----------
+    generator : np.random.Generator
+        Generator the blocks are drawn from
+    """
+
+    __slots__ = ("generator", "size", "_dice", "_uniforms", "_orders")
+
+    def __init__(self, seed=None, size=BUFFER_SIZE):
+        self.generator = np.random.default_rng(seed)
+        self.size = size
+        self._dice = iter(())
+        self._uniforms = iter(())
+        self._orders = dict()
+
+    def random(self):
+        """Uniform float in [0, 1)"""
+        try:
+            return next(self._uniforms)
+        except StopIteration:
+            self._uniforms = iter(self.generator.random(self.size).tolist())
+            return next(self._uniforms)
+
+    def randint(self, a, b):
+        """Random integer in [a, b], dice rolls of 1 to 3 come from the buffer"""
+        if (a, b) != (1, 3):
+            return int(self.generator.integers(a, b + 1))
+        try:
+            return next(self._dice)
+        except StopIteration:
+            self._dice = iter(self.generator.integers(1, 4, self.size).tolist())
+            return next(self._dice)
+
+    def choice(self, seq):
+        """Random element of a non-empty sequence"""
+        return seq[int(self.random() * len(seq))]
+
+    def permutation(self, n):
+        """Random order of `range(n)`
+
+        Parameters
+        ----------
+        n : int
+            Number of items, a block of orders is drawn for each `n`
+
+        Returns
+        -------
+        list
+            Shuffled indices
+        """
+        order = next(self._orders.get(n, iter(())), None)
+        if order is None:
+            block = np.argsort(self.generator.random((self.size, n)), axis=1)
+            self._orders[n] = iter(block.tolist())
+            order = next(self._orders[n])
+        return order
+
+
+class DiceStream:
+    """Dice for a single simulation, used in place of the `random` module
+
+    Reads the rows of a `DiceBlock` drawn for the simulation, the rank of each
+    camel in `config.CAMELS` and its die for every leg. `choice` picks the camel
+    with the lowest rank among those that need to roll and `randint` gives the
+    die of the camel picked last. A new leg starts when more camels need to roll
+    than at the previous pick.
+
+    Attributes
+    ----------
+    ranks : list
+        Rank of each camel in each leg
+    dice : list
+        Die of each camel in each leg
+    """
+
+    __slots__ = ("ranks", "dice", "leg", "camel", "need_roll")
+
+    def __init__(self, ranks, dice):
+        self.ranks = ranks
+        self.dice = dice
+        self.leg = -1
+        self.camel = None
+        self.need_roll = 0
+
+    def choice(self, need_roll):
+        if len(need_roll) > self.need_roll:
+            self.leg += 1
+        self.need_roll = len(need_roll)
+        ranks = self.ranks[self.leg]
+        self.camel = min(need_roll, key=lambda camel: ranks[CAMEL_INDEX[camel]])
+        return self.camel
+
+    def randint(self, a, b):
+        assert (a, b) == (1, 3), "common dice only roll the camel dice"
+        return self.dice[self.leg][CAMEL_INDEX[self.camel]]
+
+
+class DiceBlock:
+    """Block of dice shared by every evaluation in a search
+
+    The rolling order and dice of `LEGS` legs are drawn for `BLOCK_ROWS`
+    simulations at a time with `simulation.leg_order`, so the dice of a
+    simulation only depend on the seed and its index. Pickling keeps only the
+    seed, a worker draws the block again.
+
+    Parameters
+    ----------
+    seed : int
+        Seed of the block, drawn at random when None
+
+    Attributes
+    ----------
+    seed : int
+        Seed of the block
+    ranks : array
+        Rank of each camel in `config.CAMELS` in each leg of each simulation
+    dice : array
+        Die of each camel in each leg of each simulation
+    """
+
+    __slots__ = ("seed", "generator", "ranks", "dice")
+
+    def __init__(self, seed=None):
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.generator = np.random.default_rng(self.seed)
+        shape = (0, LEGS, len(config.CAMELS))
+        self.ranks = np.empty(shape, dtype=np.int8)
+        self.dice = np.empty(shape, dtype=np.int8)
+
+    def __reduce__(self):
+        return DiceBlock, (self.seed,)
+
+    def draw(self, num_simulations):
+        """Draws the dice of the first `num_simulations` simulations
+
+        Parameters
+        ----------
+        num_simulations : int
+            Number of simulations the block has to cover
+        """
+        num_camels = len(config.CAMELS)
+        shape = (BLOCK_ROWS, LEGS, num_camels)
+        ranks = [self.ranks]
+        dice = [self.dice]
+        for _ in range(-(-(num_simulations - len(self.ranks)) // BLOCK_ROWS)):
+            order, rolls = simulation.leg_order(
+                BLOCK_ROWS * LEGS, num_camels, self.generator
+            )
+            ranks.append(np.argsort(order, axis=1).astype(np.int8).reshape(shape))
+            dice.append(rolls.astype(np.int8).reshape(shape))
+        if len(ranks) > 1:
+            self.ranks = np.concatenate(ranks)
+            self.dice = np.concatenate(dice)
+
+    def stream(self, index):
+        """Dice for the simulation at `index`
+
+        Parameters
+        ----------
+        index : int
+            Index of the simulation
+
+        Returns
+        -------
+        DiceStream
+            The same dice every time for the same block and index
+        """
+        self.draw(index + 1)
+        return DiceStream(self.ranks[index].tolist(), self.dice[index].tolist())
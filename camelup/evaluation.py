@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""Module with the dense utility model
+
+What each player holds is encoded as fixed-shape integer matrices indexed by
+player and by camel, in the order of `config.CAMELS`, and the probabilities of a
+position as vectors over the same camels. The utility of every player is then a
+few matrix products, the same utility `treesearch.position_utility` builds from
+joined structured arrays. Positions stacked along a leading batch axis are
+evaluated in a single call.
+"""
+
+import logging
+
+from collections import namedtuple
+
+import numpy as np
+
+import camelup.config as config
+
+
+logger = logging.getLogger(__name__)
+
+CAMEL_IDS = {camel: index for index, camel in enumerate(config.CAMELS)}
+
+GAME_BET_THRESHOLD = 0.30
+
+FIRST, SECOND, OTHER, GAME_FIRST, GAME_LAST = range(5)
+
+Holdings = namedtuple(
+    "Holdings",
+    [
+        "coins",
+        "tile_value",
+        "tile_count",
+        "winner_points",
+        "winner_count",
+        "loser_points",
+        "loser_count",
+    ],
+)
+
+
+def encode(game):
+    """What each player holds, as dense arrays
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+
+    Returns
+    -------
+    Holdings
+        Coins of each player, then player by camel matrices of the value and
+        number of bet tiles held, and of the points and number of winner and
+        loser bets, a game bet scores `config.BET_SCALING` by its order
+    """
+    num_players = game.num_players
+    shape = (num_players, len(config.CAMELS))
+    coins = np.zeros(num_players, dtype=np.int64)
+    tile_value = np.zeros(shape, dtype=np.int64)
+    tile_count = np.zeros(shape, dtype=np.int64)
+    for player, val in game.player_dict.items():
+        coins[player - 1] = val["coins"]
+        for camel, tiles in val["bet_tiles"].items():
+            tile_value[player - 1, CAMEL_IDS[camel]] = sum(tiles)
+            tile_count[player - 1, CAMEL_IDS[camel]] = len(tiles)
+    bets = []
+    for game_bets in (game.winner_bets, game.loser_bets):
+        points = np.zeros(shape, dtype=np.int64)
+        count = np.zeros(shape, dtype=np.int64)
+        for order, (player, camel) in enumerate(game_bets):
+            scaling = config.BET_SCALING[min(order, len(config.BET_SCALING) - 1)]
+            points[player - 1, CAMEL_IDS[camel]] += scaling
+            count[player - 1, CAMEL_IDS[camel]] += 1
+        bets += [points, count]
+    return Holdings(coins, tile_value, tile_count, *bets)
+
+
+def encode_probs(turn_probs, game_probs, num_players):
+    """Probabilities of a position as dense arrays
+
+    Parameters
+    ----------
+    turn_probs : tuple
+        First, second and other place probabilities for the leg and the expected
+        tile points, as returned by `treesearch.turn_prob_numpy`
+    game_probs : tuple
+        First and last place probabilities for the game, as returned by
+        `treesearch.game_prob_numpy`
+    num_players : int
+        Number of players
+
+    Returns
+    -------
+    array
+        Probabilities by camel, one row each for `FIRST`, `SECOND`, `OTHER`,
+        `GAME_FIRST` and `GAME_LAST`, game probabilities under
+        `GAME_BET_THRESHOLD` count as 0
+    array
+        Expected tile points of each player
+    """
+    probs = np.zeros((5, len(config.CAMELS)))
+    *places, exp_tile_points = turn_probs
+    for row, array in enumerate([*places, *game_probs]):
+        probs[row, [CAMEL_IDS[camel] for camel in array["camel"]]] = array["prob"]
+    game_places = probs[GAME_FIRST:]
+    probs[GAME_FIRST:] = np.where(game_places < GAME_BET_THRESHOLD, 0, game_places)
+    tile_points = np.zeros(num_players)
+    players = exp_tile_points["player"].astype(np.int64)
+    known = (players >= 1) & (players <= num_players)
+    tile_points[players[known] - 1] = exp_tile_points["exp_points"][known]
+    return probs, tile_points
+
+
+def stack(holdings):
+    """Stacks positions along a leading batch axis
+
+    Parameters
+    ----------
+    holdings : list of Holdings
+        Encoded positions with the same number of players
+
+    Returns
+    -------
+    Holdings
+        Arrays with the positions along the first axis
+    """
+    return Holdings(*(np.stack(arrays) for arrays in zip(*holdings)))
+
+
+def utilities(holdings, probs, tile_points):
+    """Expected utility of every player
+
+    The coins and expected tile points, plus the bet tiles paying their value on
+    first, 1 on second and -1 otherwise, plus the game bets paying their points
+    if right and -1 if wrong.
+
+    Parameters
+    ----------
+    holdings : Holdings
+        Encoded positions, with or without a batch axis
+    probs : array
+        Probabilities from `encode_probs`, batched the same way
+    tile_points : array
+        Expected tile points from `encode_probs`, batched the same way
+
+    Returns
+    -------
+    array
+        Utility of each player, with the batch axis first if there is one
+    """
+    first = probs[..., FIRST, :]
+    game_first = probs[..., GAME_FIRST, :]
+    game_last = probs[..., GAME_LAST, :]
+    return (
+        holdings.coins
+        + tile_points
+        + _dot(holdings.tile_value, first)
+        + _dot(holdings.tile_count, probs[..., SECOND, :] - probs[..., OTHER, :])
+        + _dot(holdings.winner_points, game_first)
+        - _dot(holdings.winner_count, 1 - game_first)
+        + _dot(holdings.loser_points, game_last)
+        - _dot(holdings.loser_count, 1 - game_last)
+    )
+
+
+def _dot(matrix, vector):
+    """
+    Player by camel matrices times camel vectors, over any batch axes
+    """
+    return np.einsum("...pc,...c->...p", matrix, vector)
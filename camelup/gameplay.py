@@ -59,6 +59,29 @@ def move(camel_dict, tiles_dict, camel, roll):
     return give_points
 
 
+def leg_reach(camel_dict, tiles_dict):
+    """Furthest space a camel can get to by the end of the leg
+
+    Every roll left moves a stack at most 3 spaces, 4 with a skip tile, past the
+    camel in front.
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+
+    Returns
+    -------
+    int
+        Space past which no camel can be at the end of the leg
+    """
+    step = 3 + any(tile["tile_type"] == "skip" for tile in tiles_dict.values())
+    rolls = sum(val["need_roll"] for val in camel_dict.values())
+    return max(val["space"] for val in camel_dict.values()) + step * rolls
+
+
 def reg_move(camel_dict, movers, destination, min_height_movers, max_height_dest):
     """Executing a regular move
 
@@ -168,3 +191,145 @@ def camels_in_dest(camel_dict, destination):
                 max_height_dest = val["height"]
             destinationers.append(key)
     return max_height_dest, destinationers
+
+
+class Board:
+    """Board held as an ordered stack of camels per space
+
+    Alternative to walking `camel_dict` for every roll. Each space holds its
+    camels from bottom to top, so the camels moving are a slice of the stack and
+    heights come from the position in the stack. Spaces with camels and tiles are
+    kept as bitmasks so checking a destination is a single bit test.
+
+    Attributes
+    ----------
+    stacks : dict
+        Camels on each occupied space, from bottom to top
+    spaces : dict
+        Space of each camel
+    occupied : int
+        Bitmask of the spaces with camels
+    skips : int
+        Bitmask of the spaces with skip tiles
+    blocks : int
+        Bitmask of the spaces with block tiles
+    """
+
+    __slots__ = ("stacks", "spaces", "occupied", "skips", "blocks")
+
+    def __init__(self, camel_dict, tiles_dict):
+        self.stacks = dict()
+        self.spaces = dict()
+        self.occupied = 0
+        for camel in sorted(camel_dict, key=lambda x: camel_dict[x]["height"]):
+            space = camel_dict[camel]["space"]
+            self.stacks.setdefault(space, []).append(camel)
+            self.spaces[camel] = space
+            self.occupied |= 1 << space
+        self.skips = 0
+        self.blocks = 0
+        for space, tile in tiles_dict.items():
+            if tile["tile_type"] == "skip":
+                self.skips |= 1 << space
+            else:
+                self.blocks |= 1 << space
+
+    def copy(self):
+        """Copy of the board, tiles are shared as they don't change in a leg
+
+        Returns
+        -------
+        Board
+            Copied board
+        """
+        board = Board.__new__(Board)
+        board.stacks = {space: stack[:] for space, stack in self.stacks.items()}
+        board.spaces = self.spaces.copy()
+        board.occupied = self.occupied
+        board.skips = self.skips
+        board.blocks = self.blocks
+        return board
+
+    def move(self, camel, roll):
+        """Moves the camel and the camels on top of it, same rules as `move`
+
+        Parameters
+        ----------
+        camel : str
+            Name of camel that was rolled
+        roll : int
+            Roll on dice, ranges from 1 to 3
+
+        Returns
+        -------
+        give_points : int
+            The tile which was landed on and thusly should give points
+        """
+        space = self.spaces[camel]
+        stack = self.stacks[space]
+        index = stack.index(camel)
+        movers = stack[index:]
+        del stack[index:]
+        if not stack:
+            del self.stacks[space]
+            self.occupied &= ~(1 << space)
+        destination = space + roll
+        give_points = None
+        block = False
+        if (self.skips | self.blocks) >> destination & 1:
+            give_points = destination
+            if self.skips >> destination & 1:
+                destination += 1
+            else:
+                destination -= 1
+                block = True
+        if self.occupied >> destination & 1:
+            if block:
+                self.stacks[destination][:0] = movers
+            else:
+                self.stacks[destination].extend(movers)
+        else:
+            self.stacks[destination] = movers
+            self.occupied |= 1 << destination
+        for mover in movers:
+            self.spaces[mover] = destination
+        return give_points
+
+    def update(self, camel_dict):
+        """Writes the camel positions back to the camel dictionary
+
+        Parameters
+        ----------
+        camel_dict : nested dict
+            Dictionary with camel positions to update
+        """
+        for space, stack in self.stacks.items():
+            for height, camel in enumerate(stack):
+                camel_dict[camel]["space"] = space
+                camel_dict[camel]["height"] = height + 1
+
+    def tile_placements(self, pruned=False):
+        """Compute the spaces a tile can be placed on
+
+        A tile can't go on a space with a camel, a tile, or next to a tile, and has
+        to be ahead of the last blocked space.
+
+        Parameters
+        ----------
+        pruned : bool
+            Only allow spaces up to 3 past the last blocked space
+
+        Returns
+        -------
+        list
+            List of available spaces of tiles
+        """
+        tiles = self.skips | self.blocks
+        blocked = self.occupied | tiles | tiles << 1 | tiles >> 1
+        first = (blocked & -blocked).bit_length() - 1
+        last = 16
+        if pruned:
+            last = min(last, blocked.bit_length() + 2)
+        return [
+            space for space in range(first + 1, last + 1) if not blocked >> space & 1
+        ]
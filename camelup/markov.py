@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""Module with exact game probabilities from the leg by leg Markov chain
+
+After the current leg the players' tiles are gone, as `Game.sim_game` assumes, and
+every camel rolls once a leg, so the race is a Markov chain over the board at the
+start of each leg. A board is held as the spaces of its camels from the back of
+the race to the front, camels sharing a space from the bottom of the stack up, so
+camels are only labelled by that canonical order and colour permuted boards are
+the same state. The kernel of a state is the exact distribution over the boards at
+the end of its leg, enumerated over every rolling order and die with the boards
+merged after each roll, along with the places of the races that finish during the
+leg. Chaining the kernels gives the probability of each camel finishing in each
+place, exactly or with the least likely boards of every leg dropped up to a
+tolerance. Kernels and solved states are memoised in
+`MEMO`, which `game_counts` loads from `MEMO_PATH` the first time it runs and saves
+back when the interpreter exits, so they're kept between runs.
+"""
+
+import atexit
+import logging
+import os
+import pickle
+
+from collections import namedtuple
+
+import numpy as np
+
+from camelup.counts import RaceCounts
+from camelup.simulation import FINISH, STACK, STACK_BITS
+
+
+logger = logging.getLogger(__name__)
+
+MEMO_PATH = os.path.join(os.path.expanduser("~"), ".camelup", "markov.pkl")
+
+MEMO = {"kernels": dict(), "places": dict()}
+
+MEMO_FILE = None
+
+KEY_BITS = 9
+
+Kernel = namedtuple("Kernel", ["states", "perms", "probs", "places"])
+
+
+def leg_kernel(state):
+    """Exact distribution of the leg played from a state, memoised in `MEMO`
+
+    A leg that can't reach the finish is the same further up the track, so it's
+    enumerated once relative to the rearmost camel, keyed ``("rel", offsets)``,
+    and shifted. Only the legs that can reach it are enumerated from the
+    absolute state, keyed ``("abs", state)``.
+
+    Parameters
+    ----------
+    state : tuple
+        Spaces of the camels in canonical order, every camel still to roll
+
+    Returns
+    -------
+    Kernel
+        `states` and `perms` hold a row for each board at the end of the leg, the
+        spaces of its camels in canonical order and the camel of `state` each one
+        is, `probs` the probability of each board, and `places` the probability
+        of each camel of `state` finishing in each place during the leg
+    """
+    rear = state[0]
+    offsets = tuple(space - rear for space in state)
+    kernel = MEMO["kernels"].get(("rel", offsets))
+    if kernel is None:
+        kernel = MEMO["kernels"][("rel", offsets)] = enumerate_leg(offsets)
+    if rear + kernel.states[:, -1].max(initial=0) <= FINISH:
+        return kernel._replace(states=kernel.states + rear)
+    kernel = MEMO["kernels"].get(("abs", state))
+    if kernel is None:
+        kernel = MEMO["kernels"][("abs", state)] = enumerate_leg(state, FINISH)
+    return kernel
+
+
+def enumerate_leg(state, finish=None):
+    """Enumerates every way the leg can play out from a state
+
+    Boards are held as rows of camel codes ``space * STACK + height``, as in
+    `simulation.simulate`. At each step every row branches into every camel left
+    to roll and every die at once, and the rows reaching the same board with the
+    same camels left to roll are merged with `np.unique`, as in
+    `Game.leg_outcomes`.
+
+    Parameters
+    ----------
+    state : tuple
+        Spaces of the camels in canonical order, every camel still to roll
+    finish : int
+        Space the race ends past, None for a track without an end
+
+    Returns
+    -------
+    Kernel
+        Distribution of the leg, see `leg_kernel`
+    """
+    num_camels = len(state)
+    heights = [state[:camel].count(space) + 1 for camel, space in enumerate(state)]
+    position = (np.array(state) * STACK + np.array(heights))[None, :]
+    need_roll = np.ones((1, num_camels), dtype=bool)
+    prob = np.ones(1)
+    places = np.zeros((num_camels, num_camels))
+    shifts = KEY_BITS * np.arange(num_camels)
+    for left in range(num_camels, 0, -1):
+        num_rows = position.shape[0]
+        parent = np.repeat(np.arange(num_rows), left * 3)
+        camel = np.repeat(np.nonzero(need_roll)[1], 3)
+        die = np.tile(np.arange(1, 4), num_rows * left)
+        rows = np.arange(parent.size)
+        position = position[parent]
+        need_roll = need_roll[parent]
+        prob = prob[parent] / (left * 3)
+        camel_position = position[rows, camel]
+        camel_space = camel_position >> STACK_BITS
+        destination = camel_space + die
+        movers = (position >= camel_position[:, None]) & (
+            position < (camel_space * STACK + STACK)[:, None]
+        )
+        top = (position >> STACK_BITS == destination[:, None]).sum(axis=1)
+        position += movers * (destination * STACK + top + 1 - camel_position)[:, None]
+        need_roll[rows, camel] = False
+        if finish is not None:
+            done = destination > finish
+            front_to_back = np.argsort(-position[done], axis=1)
+            np.add.at(places, (front_to_back, np.arange(num_camels)), prob[done, None])
+            position = position[~done]
+            need_roll = need_roll[~done]
+            prob = prob[~done]
+        keys = (position << shifts).sum(axis=1) << num_camels
+        keys |= (need_roll << np.arange(num_camels)).sum(axis=1)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        prob = np.bincount(inverse.ravel(), weights=prob)
+        position = position[first]
+        need_roll = need_roll[first]
+    perms = np.argsort(position, axis=1)
+    states = np.take_along_axis(position, perms, axis=1) >> STACK_BITS
+    return Kernel(states.astype(np.int8), perms.astype(np.int8), prob, places)
+
+
+def solve(state, tol=0.0):
+    """Probability of each camel finishing the race in each place
+
+    Parameters
+    ----------
+    state : tuple
+        Spaces of the camels in canonical order at the start of a leg
+    tol : float
+        Probability of the least likely boards dropped at the end of every leg,
+        the rest are scaled up to make up for them, 0 solves exactly
+
+    Returns
+    -------
+    array
+        Camel by place probabilities, camels in canonical order and place 1 in
+        column 0
+    """
+    places = MEMO["places"].get((state, tol))
+    if places is not None:
+        return places
+    kernel = leg_kernel(state)
+    places = kernel.places.copy()
+    probs = kernel.probs
+    rows = np.argsort(-probs, kind="stable")
+    if tol > 0:
+        dropped = np.cumsum(probs[rows][::-1])[::-1] <= tol
+        rows = rows[~dropped]
+        kept = probs[rows].sum()
+        if kept > 0:
+            probs = probs * (probs.sum() / kept)
+    if rows.size:
+        children = np.stack(
+            [solve(tuple(child), tol) for child in kernel.states[rows].tolist()]
+        )
+        np.add.at(places, kernel.perms[rows], probs[rows, None, None] * children)
+    MEMO["places"][(state, tol)] = places
+    return places
+
+
+def game_counts(game, camel_dict, tiles_dict, iter=1000, tol=0.0):
+    """Game probabilities with the current leg enumerated and the rest solved
+
+    The current leg is played out with `Game.leg_outcomes`, with its tiles and the
+    camels left to roll, and every board at its end is solved with `solve`.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    iter : int
+        Number of races the probabilities are scaled to, for the `RaceCounts`
+    tol : float
+        Truncation tolerance of `solve`
+
+    Returns
+    -------
+    RaceCounts
+        Probabilities of each place, scaled so that they sum to `iter` races
+    """
+    open_memo()
+    counts = RaceCounts(camel_dict)
+    prob = np.zeros((len(counts.camels), len(counts.camels)))
+    for sim_dict, weight, _ in game.leg_outcomes(camel_dict, tiles_dict):
+        if any(val["space"] > FINISH for val in sim_dict.values()):
+            for camel, place in game._winner(sim_dict).items():
+                prob[counts.index[camel], place - 1] += weight
+        else:
+            camels = sorted(
+                sim_dict,
+                key=lambda camel: (sim_dict[camel]["space"], sim_dict[camel]["height"]),
+            )
+            state = tuple(sim_dict[camel]["space"] for camel in camels)
+            index = [counts.index[camel] for camel in camels]
+            prob[index] += weight * solve(state, tol)
+    counts.places = prob * iter
+    counts.n = iter
+    return counts
+
+
+def open_memo():
+    """Loads `MEMO` from `MEMO_PATH` on first use and saves it there at exit
+
+    Only the first call reads the file, it's kept in `MEMO_FILE` so the memo is
+    saved back to the file it came from.
+    """
+    global MEMO_FILE
+    if MEMO_FILE is not None:
+        return
+    MEMO_FILE = MEMO_PATH
+    load(MEMO_FILE)
+    atexit.register(save, MEMO_FILE)
+
+
+def load(path=None):
+    """Loads the memo saved by `save`, keeping what's already in `MEMO`
+
+    Parameters
+    ----------
+    path : str
+        File to load, `MEMO_PATH` when None
+
+    Returns
+    -------
+    bool
+        Whether the file existed
+    """
+    path = MEMO_PATH if path is None else path
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as file:
+        memo = pickle.load(file)
+    for key, val in memo.items():
+        MEMO[key].update(val)
+    logger.info(f"Loaded {len(MEMO['kernels'])} kernels from {path}")
+    return True
+
+
+def save(path=None):
+    """Saves `MEMO` so the kernels and solved states are kept between runs
+
+    Parameters
+    ----------
+    path : str
+        File to save to, `MEMO_PATH` when None
+    """
+    path = MEMO_PATH if path is None else path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as file:
+        pickle.dump(MEMO, file, protocol=pickle.HIGHEST_PROTOCOL)
+    logger.info(f"Saved {len(MEMO['kernels'])} kernels to {path}")
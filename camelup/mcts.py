@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""Module with Monte Carlo tree search decisioning
+
+An alternative to `treesearch` that grows the tree one simulation at a time with
+UCT over the pruned moves. A roll leads to a chance node whose outcomes, the camel
+and its die, are drawn from the game's generator so each is visited in proportion
+to its probability. Every simulation ends with a playout where the players only
+roll until the race is over, the coins at the end are the reward of each player.
+Nodes keep the reward of every player and pick children for the player whose turn
+it is, the same max^n as `treesearch` with sampled values in place of
+`calc_utility_np`.
+"""
+
+import logging
+import math
+import time
+
+import camelup.camelup as camulup
+
+
+logger = logging.getLogger(__name__)
+
+simulations = 2000
+
+exploration = 5.0
+
+
+class Node:
+    """Statistics of a move, or of a roll outcome, in the search tree
+
+    Attributes
+    ----------
+    visits : int
+        Simulations through the node
+    rewards : list
+        Total reward of each player over those simulations
+    children : dict
+        Child nodes by `Move`, or by camel and die below a roll
+    untried : list
+        Moves not expanded yet, None until the node is first reached
+    """
+
+    __slots__ = ("visits", "rewards", "children", "untried")
+
+    def __init__(self, num_players):
+        self.visits = 0
+        self.rewards = [0.0] * num_players
+        self.children = dict()
+        self.untried = None
+
+
+def get_move(game, num_simulations=None, budget_ms=None):
+    """Recommends the most optimal move
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    num_simulations : int
+        Simulations to run, `simulations` when None, no limit but the time with a
+        `budget_ms`
+    budget_ms : float
+        Wall time budget in milliseconds, None to run every simulation
+
+    Returns
+    -------
+    dict
+        Dictionary of `Move` and their mean reward in coins, for the moves visited
+    int
+        Only with a `budget_ms`, depth of the deepest move in the tree
+    """
+    if num_simulations is None and budget_ms is None:
+        num_simulations = simulations
+    deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+    player = game.state
+    game = game.copy()
+    state = game.get_state()
+    root = Node(game.num_players)
+    max_depth = 0
+    count = 0
+    while num_simulations is None or count < num_simulations:
+        if count and deadline is not None and time.perf_counter() > deadline:
+            break
+        game.set_state(state)
+        max_depth = max(max_depth, simulate(game, root))
+        count += 1
+    logger.info(f"{count} simulations, depth {max_depth}")
+    results = {
+        move: child.rewards[player - 1] / child.visits
+        for move, child in root.children.items()
+        if child.visits
+    }
+    if budget_ms is None:
+        return results
+    return results, max_depth
+
+
+def simulate(game, root):
+    """Runs a single simulation from the root, updating the nodes it passes
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class in the position of `root`, played in place
+    root : Node
+        Root of the tree
+
+    Returns
+    -------
+    int
+        Number of moves played in the tree before the playout
+    """
+    node = root
+    path = [node]
+    depth = 0
+    output = None
+    while output != "Done":
+        expand = node.untried is None or bool(node.untried)
+        if node.untried is None:
+            node.untried = game.legal_moves(pruned=True)[::-1]
+        if expand:
+            move = node.untried.pop()
+            child = node.children[move] = Node(game.num_players)
+        else:
+            move, child = select(node, game.state)
+        path.append(child)
+        depth += 1
+        if move.kind == "roll":
+            output, child = roll(game, child)
+            path.append(child)
+        else:
+            output = game.play(move)
+        node = child
+        if expand:
+            break
+    if output == "Done":
+        rewards = [val["coins"] for val in game.player_dict.values()]
+    else:
+        rewards = playout(game)
+    for node in path:
+        node.visits += 1
+        node.rewards = [total + reward for total, reward in zip(node.rewards, rewards)]
+    return depth
+
+
+def select(node, player):
+    """Child with the highest upper confidence bound for the player to move
+
+    Parameters
+    ----------
+    node : Node
+        Fully expanded node
+    player : int
+        Player whose turn it is
+
+    Returns
+    -------
+    tuple
+        Move and child node
+    """
+    log_visits = math.log(node.visits)
+    return max(
+        node.children.items(),
+        key=lambda item: item[1].rewards[player - 1] / item[1].visits
+        + exploration * math.sqrt(log_visits / item[1].visits),
+    )
+
+
+def roll(game, node):
+    """Plays a random roll below a chance node
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    node : Node
+        Chance node of the roll
+
+    Returns
+    -------
+    tuple
+        Output of the play and the node of the outcome
+    """
+    need_roll = [camel for camel, val in game.camel_dict.items() if val["need_roll"]]
+    camel = game.rng.choice(need_roll)
+    die = game.rng.randint(1, 3)
+    child = node.children.get((camel, die))
+    if child is None:
+        child = node.children[(camel, die)] = Node(game.num_players)
+    return game.play(camulup.Move("roll", camel, roll=die)), child
+
+
+def playout(game):
+    """Rolls random camels until the race is over
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class, played in place
+
+    Returns
+    -------
+    list
+        Coins of each player at the end of the game
+    """
+    output = None
+    while output != "Done":
+        need_roll = [
+            camel for camel, val in game.camel_dict.items() if val["need_roll"]
+        ]
+        camel = game.rng.choice(need_roll)
+        output = game.play(camulup.Move("roll", camel, roll=game.rng.randint(1, 3)))
+    return [val["coins"] for val in game.player_dict.values()]
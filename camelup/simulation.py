@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+
+"""Module with vectorized race simulation
+
+Races are held as integer arrays with one row per race and one column per camel,
+so thousands of races are advanced together with numpy instead of walking
+`gameplay.move` over dictionaries one race at a time.
+"""
+
+import logging
+
+from itertools import permutations, product
+
+import numpy as np
+
+from camelup.counts import RaceCounts
+
+
+logger = logging.getLogger(__name__)
+
+FINISH = 16
+
+SKIP = 1
+
+BLOCK = 2
+
+BOARD_SIZE = 32
+
+STACK = 8
+
+STACK_BITS = 3
+
+LEG_TABLES = dict()
+
+
+def camels_to_arrays(camel_dict, camels):
+    """Camel dictionary to position arrays
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    camels : list
+        Order of the camel columns
+
+    Returns
+    -------
+    tuple of arrays
+        Space, height and need roll of each camel
+    """
+    space = np.array([camel_dict[camel]["space"] for camel in camels], dtype=np.int64)
+    height = np.array([camel_dict[camel]["height"] for camel in camels], dtype=np.int64)
+    need_roll = np.array(
+        [camel_dict[camel]["need_roll"] for camel in camels], dtype=bool
+    )
+    return space, height, need_roll
+
+
+def tiles_to_arrays(tiles_dict):
+    """Tiles dictionary to arrays indexed by space
+
+    Parameters
+    ----------
+    tiles_dict : dict
+        Dictonary with tiles information
+
+    Returns
+    -------
+    tuple of arrays
+        Tile type (0 for no tile, `SKIP` or `BLOCK`) and owner of each space
+    """
+    tile_type = np.zeros(BOARD_SIZE, dtype=np.int64)
+    tile_player = np.zeros(BOARD_SIZE, dtype=np.int64)
+    for space, tile in tiles_dict.items():
+        tile_type[space] = SKIP if tile["tile_type"] == "skip" else BLOCK
+        tile_player[space] = tile["player"]
+    return tile_type, tile_player
+
+
+def places(space, height):
+    """Computes the places of camels in each race
+
+    Parameters
+    ----------
+    space : array
+        Space of each camel, one row per race
+    height : array
+        Height of each camel, one row per race
+
+    Returns
+    -------
+    array
+        Place of each camel, 1 is the leader
+    """
+    order = np.argsort(-(space * BOARD_SIZE + height), axis=1, kind="stable")
+    place = np.empty_like(order)
+    np.put_along_axis(place, order, np.arange(1, order.shape[1] + 1)[None, :], axis=1)
+    return place
+
+
+def roll_order(need_roll, rng):
+    """Draws the order the camels roll in for the leg and the value of each die
+
+    Parameters
+    ----------
+    need_roll : array
+        Whether each camel still needs to roll, one row per race
+    rng : numpy Generator
+        Random generator for the order
+
+    Returns
+    -------
+    tuple of arrays
+        Camel columns in rolling order, camels that don't need a roll come last,
+        and the roll of each slot in that order
+    """
+    keys = np.where(need_roll, rng.random(need_roll.shape), -1.0)
+    return np.argsort(-keys, axis=1), rng.integers(1, 4, need_roll.shape)
+
+
+def leg_order(num_races, num_camels, rng):
+    """Draws the rolling order and dice of a leg where every camel rolls
+
+    Same as `roll_order` with every camel needing a roll, but a single draw per
+    race picks a row of the table of the permutations of the camels and a row of
+    the table of the dice, memoised in `LEG_TABLES`, instead of sorting random
+    keys.
+
+    Parameters
+    ----------
+    num_races : int
+        Number of races starting a leg
+    num_camels : int
+        Number of camels
+    rng : numpy Generator
+        Random generator for the order
+
+    Returns
+    -------
+    tuple of arrays
+        Camel columns in rolling order and the roll of each slot in that order
+    """
+    tables = LEG_TABLES.get(num_camels)
+    if tables is None:
+        tables = LEG_TABLES[num_camels] = (
+            np.array([*permutations(range(num_camels))]).reshape(-1, num_camels),
+            np.array([*product(range(1, 4), repeat=num_camels)]).reshape(
+                -1, num_camels
+            ),
+        )
+    orders, dice = tables
+    draw = rng.integers(0, orders.shape[0] * dice.shape[0], num_races)
+    return (
+        orders.take(draw // dice.shape[0], axis=0),
+        dice.take(draw % dice.shape[0], axis=0),
+    )
+
+
+def simulate(space, height, need_roll, tile_type, tile_player, rng, max_legs=None):
+    """Advances a batch of races until they finish
+
+    Tiles only apply to the first leg of each race, as in `Game.sim_game`. The
+    rolling order and dice of a leg are drawn when the leg starts, which is the
+    same as picking a random camel that still needs to roll at every step.
+
+    While running, each camel is held as a single uint8 code
+    ``space * STACK + height`` in a camel by race array, so every operation runs
+    along the long race axis. Stacks are contiguous from height 1, so the camels
+    moving are the codes between the rolled camel and the top of its space, and
+    the height of a stack is the number of camels on its space. Races that are
+    over are written out straight away and dropped from the working arrays once a
+    quarter of the rows are over.
+
+    Parameters
+    ----------
+    space : array
+        Space of each camel, one row per race, modified in place
+    height : array
+        Height of each camel, one row per race, modified in place
+    need_roll : array
+        Whether each camel still needs to roll, modified in place
+    tile_type : array
+        Tile type of each space, or one row per race for races on different boards
+    tile_player : array
+        Owner of the tile of each space, laid out as `tile_type`
+    rng : numpy Generator
+        Random generator for the rolls
+    max_legs : int
+        Stop each race after this many legs, None to play until the finish
+
+    Returns
+    -------
+    tuple of arrays
+        Whether each race finished and the tile points given to each player
+    """
+    num_races, num_camels = space.shape
+    tile_type = np.broadcast_to(tile_type, (num_races, BOARD_SIZE))
+    tile_player = np.broadcast_to(tile_player, (num_races, BOARD_SIZE))
+    finished = np.zeros(num_races, dtype=bool)
+    tile_points = np.zeros((num_races, tile_player.max() + 1), dtype=np.int64)
+    ids = np.arange(num_races)
+    alive = np.ones(num_races, dtype=bool)
+    position = np.ascontiguousarray((space * STACK + height).T, dtype=np.uint8)
+    final = np.empty((num_races, num_camels), dtype=np.uint8)
+    legs = np.zeros(num_races, dtype=np.int64)
+    if need_roll.all():
+        order, dice = leg_order(num_races, num_camels, rng)
+    else:
+        order, dice = roll_order(need_roll, rng)
+    step = np.zeros(num_races, dtype=np.int64)
+    num_rolls = need_roll.sum(axis=1)
+    rows = np.arange(num_races) * num_camels
+    cols = np.arange(num_races)
+    tiles = bool(tile_type.any())
+    while ids.size:
+        num_active = ids.size
+        slot = rows + step
+        camel = order.take(slot)
+        step += 1
+        camel_position = position.take(camel * num_active + cols)
+        camel_space = camel_position >> STACK_BITS
+        destination = camel_space + dice.take(slot)
+        movers = position - camel_position < STACK - (camel_position & STACK - 1)
+        if tiles:
+            tiles = bool((legs == 0).any())
+        if tiles:
+            landing = np.minimum(destination, BOARD_SIZE - 1)
+            tile = np.where((legs == 0) & alive, tile_type[ids, landing], 0)
+            tiled = np.flatnonzero(tile)
+            owner = tile_player[ids[tiled], landing[tiled]]
+            np.add.at(tile_points, (ids[tiled], owner), 1)
+            block = tile == BLOCK
+            destination += (tile == SKIP).astype(np.int64) - block
+            on_dest = (position >> STACK_BITS == destination) & ~movers
+            top = np.where(block, 0, on_dest.sum(axis=0, dtype=np.uint8))
+            position += on_dest * (block * movers.sum(axis=0)).astype(np.uint8)
+        else:
+            on_dest = position >> STACK_BITS == destination.astype(np.uint8)
+            top = on_dest.sum(axis=0, dtype=np.uint8)
+        # Codes wrap around as uint8, a camel moving back under a block adds a
+        # negative offset
+        offset = (destination * STACK + top + 1 - camel_position).astype(np.uint8)
+        position += movers.view(np.uint8) * offset
+
+        done = destination > FINISH
+        leg_over = ~done & (step == num_rolls)
+        legs += leg_over
+        stop = done if max_legs is None else done | (legs >= max_legs)
+        new_leg = np.flatnonzero(leg_over & ~stop)
+        if new_leg.size:
+            order[new_leg], dice[new_leg] = leg_order(new_leg.size, num_camels, rng)
+            step[new_leg] = 0
+            num_rolls[new_leg] = num_camels
+        if not stop.any():
+            continue
+        exit = stop & alive
+        exit_step = step[exit]
+        exit_rolls = num_rolls[exit]
+        step[stop] = 0
+        num_rolls[stop] = num_camels
+        if exit.any():
+            exit_ids = ids[exit]
+            finished[exit_ids] = done[exit]
+            final[exit_ids] = position[:, exit].T
+            slots = np.arange(num_camels)
+            exit_need = np.empty((exit_ids.size, num_camels), dtype=bool)
+            exit_need[np.arange(exit_ids.size)[:, None], order[exit]] = (
+                slots >= exit_step[:, None]
+            ) & (slots < exit_rolls[:, None])
+            need_roll[exit_ids] = exit_need
+            alive &= ~exit
+            if alive.sum() * 4 < num_active * 3:
+                ids = ids[alive]
+                position = position[:, alive]
+                legs = legs[alive]
+                order = order[alive]
+                dice = dice[alive]
+                step = step[alive]
+                num_rolls = num_rolls[alive]
+                alive = alive[alive]
+                rows = rows[: ids.size]
+                cols = cols[: ids.size]
+    space[:] = final >> STACK_BITS
+    height[:] = final % STACK
+    return finished, tile_points
+
+
+def game_monte(camel_dict, tiles_dict, iter=1000, rng=None):
+    """Runs monte carlo for the game, vectorized over the races
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    iter : int
+        Number of games to simulate
+    rng : numpy Generator
+        Random generator, a fresh one is created when None
+
+    Returns
+    -------
+    array
+        Numpy structured array with the place of every camel in every game
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    camels = [*camel_dict.keys()]
+    space, height, need_roll = camels_to_arrays(camel_dict, camels)
+    tile_type, tile_player = tiles_to_arrays(tiles_dict)
+    space = np.tile(space, (iter, 1))
+    height = np.tile(height, (iter, 1))
+    need_roll = np.tile(need_roll, (iter, 1))
+    simulate(space, height, need_roll, tile_type, tile_player, rng)
+    result = np.empty(space.size, dtype=[("camel", "U6"), ("place", float)])
+    result["camel"] = np.tile(camels, iter)
+    result["place"] = places(space, height).ravel()
+    return result
+
+
+def game_counts(camel_dict, tiles_dict, counts, iter=1000, rng=None):
+    """Runs monte carlo for the game into a counts accumulator
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    counts : RaceCounts
+        Accumulator the places are added to
+    iter : int
+        Number of games to simulate
+    rng : numpy Generator
+        Random generator, a fresh one is created when None
+
+    Returns
+    -------
+    RaceCounts
+        The accumulator
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    space, height, need_roll = camels_to_arrays(camel_dict, counts.camels)
+    tile_type, tile_player = tiles_to_arrays(tiles_dict)
+    space = np.tile(space, (iter, 1))
+    height = np.tile(height, (iter, 1))
+    need_roll = np.tile(need_roll, (iter, 1))
+    simulate(space, height, need_roll, tile_type, tile_player, rng)
+    counts.add_places(places(space, height))
+    return counts
+
+
+def board_counts(boards, camels, iter=1000, rng=None, max_legs=None):
+    """Runs monte carlo for many boards at once, vectorized over all their races
+
+    Parameters
+    ----------
+    boards : list of tuples
+        Camel and tiles dictionaries of each board
+    camels : list
+        Camels on every board, the order of the counts
+    iter : int
+        Number of races to simulate for each board
+    rng : numpy Generator
+        Random generator, a fresh one is created when None
+    max_legs : int
+        Stop each race after this many legs, 1 for the leg, None for the game
+
+    Returns
+    -------
+    list of RaceCounts
+        Counts of the places and tile points for each board
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    arrays = [camels_to_arrays(camel_dict, camels) for camel_dict, _ in boards]
+    space, height, need_roll = [
+        np.repeat(np.stack(array), iter, axis=0) for array in zip(*arrays)
+    ]
+    tiles = [tiles_to_arrays(tiles_dict) for _, tiles_dict in boards]
+    tile_type, tile_player = [
+        np.repeat(np.stack(array), iter, axis=0) for array in zip(*tiles)
+    ]
+    _, tile_points = simulate(
+        space, height, need_roll, tile_type, tile_player, rng, max_legs
+    )
+    place = places(space, height)
+    result = []
+    for start in range(0, place.shape[0], iter):
+        counts = RaceCounts(camels)
+        counts.add_places(
+            place[start : start + iter], tile_points[start : start + iter]
+        )
+        result.append(counts)
+    return result
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+"""Module with the compact game state
+
+`GameState` packs everything that changes during a game into one buffer of small
+ints so a snapshot copies with a single buffer copy and hashes from its bytes.
+"""
+
+import logging
+
+from array import array
+from types import MappingProxyType
+
+import camelup.config as config
+
+
+logger = logging.getLogger(__name__)
+
+BET_TILES = [5, 3, 2]
+
+TILE_SPACES = 17
+
+CARD_BITS = {camel: 1 << bit for bit, camel in enumerate(config.CAMELS)}
+
+TILE_BITS = {tile: 1 << bit for bit, tile in enumerate(BET_TILES)}
+
+CARD_MASKS = [
+    tuple(camel for camel, bit in CARD_BITS.items() if mask & bit)
+    for mask in range(1 << len(config.CAMELS))
+]
+
+TILE_MASKS = [
+    tuple(tile for tile, bit in TILE_BITS.items() if mask & bit)
+    for mask in range(1 << len(BET_TILES))
+]
+
+
+class GameState:
+    """Compact snapshot of a game
+
+    The buffer is laid out as the camel spaces, heights and need roll flags, then
+    the coins, tile flags and game cards (bitmask over `config.CAMELS`) of each
+    player, the bet tiles each player holds (bitmask over `BET_TILES`) for each
+    camel, the number of bet tiles taken from each camel, the tile on each space
+    (``2 * player + is_block``), the winner and loser bets (count then
+    ``player * 8 + camel``) and finally the player whose turn it is.
+
+    Attributes
+    ----------
+    camels : tuple
+        Names of the camels on the board
+    names : tuple
+        Names of the players
+    buffer : array
+        Packed state
+    """
+
+    __slots__ = ("camels", "names", "buffer")
+
+    def __init__(self, camels, names, buffer):
+        self.camels = camels
+        self.names = names
+        self.buffer = buffer
+
+    @classmethod
+    def from_game(cls, game):
+        """Packs a game into a state
+
+        Parameters
+        ----------
+        game : camel up game
+            Camel up game class
+
+        Returns
+        -------
+        GameState
+            Packed state of the game
+        """
+        camels = tuple(game.camel_dict)
+        values = [game.camel_dict[camel]["space"] for camel in camels]
+        values += [game.camel_dict[camel]["height"] for camel in camels]
+        values += [game.camel_dict[camel]["need_roll"] for camel in camels]
+        players = [
+            game.player_dict[player] for player in range(1, game.num_players + 1)
+        ]
+        values += [player["coins"] for player in players]
+        values += [player["tile"] for player in players]
+        values += [
+            sum(CARD_BITS[card] for card in player["game_cards"]) for player in players
+        ]
+        for player in players:
+            held = dict.fromkeys(config.CAMELS, 0)
+            for camel, tiles in player["bet_tiles"].items():
+                held[camel] = sum(TILE_BITS[tile] for tile in tiles)
+            values += held.values()
+        values += [
+            len(BET_TILES) - len(game.bet_tiles.get(camel, []))
+            for camel in config.CAMELS
+        ]
+        tiles = [0] * TILE_SPACES
+        for space, tile in game.tiles_dict.items():
+            tiles[space] = 2 * tile["player"] + (tile["tile_type"] == "block")
+        values += tiles
+        for bets in (game.winner_bets, game.loser_bets):
+            encoded = [
+                player * 8 + config.CAMELS.index(camel) for player, camel in bets
+            ]
+            values += [len(encoded)] + encoded
+            values += [0] * (game.num_players * len(config.CAMELS) - len(encoded))
+        values.append(game.state)
+        names = tuple(player["name"] for player in players)
+        return cls(camels, names, array("h", values))
+
+    @property
+    def num_players(self):
+        return len(self.names)
+
+    def _offsets(self):
+        """
+        Start of each section of the buffer
+        """
+        num_camels = len(self.camels)
+        num_players = self.num_players
+        num_cards = len(config.CAMELS)
+        players = 3 * num_camels
+        bet_tiles = players + 3 * num_players
+        taken = bet_tiles + num_players * num_cards
+        tiles = taken + num_cards
+        bets = tiles + TILE_SPACES
+        return players, bet_tiles, taken, tiles, bets
+
+    def copy(self):
+        """Copy of the state, a single buffer copy
+
+        Returns
+        -------
+        GameState
+            Copied state
+        """
+        return GameState(self.camels, self.names, self.buffer[:])
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, GameState)
+            and self.camels == other.camels
+            and self.buffer == other.buffer
+        )
+
+    def __hash__(self):
+        return hash(self.buffer.tobytes())
+
+    @property
+    def state(self):
+        return self.buffer[-1]
+
+    def camel_items(self):
+        """Unpacked camel positions
+
+        Returns
+        -------
+        dict
+            Dictionary with the camel positions, same layout as `Game.camel_dict`
+        """
+        num_camels = len(self.camels)
+        buffer = self.buffer
+        return {
+            camel: {
+                "height": buffer[num_camels + index],
+                "space": buffer[index],
+                "need_roll": bool(buffer[2 * num_camels + index]),
+            }
+            for index, camel in enumerate(self.camels)
+        }
+
+    def player_items(self):
+        """Unpacked player information
+
+        Returns
+        -------
+        dict
+            Dictionary with the player information, same layout as
+            `Game.player_dict`
+        """
+        players, bet_tiles, _, _, _ = self._offsets()
+        num_players = self.num_players
+        num_cards = len(config.CAMELS)
+        buffer = self.buffer
+        player_dict = dict()
+        for index, name in enumerate(self.names):
+            cards = buffer[players + 2 * num_players + index]
+            held = buffer[
+                bet_tiles + index * num_cards : bet_tiles + (index + 1) * num_cards
+            ]
+            player_dict[index + 1] = {
+                "game_cards": list(CARD_MASKS[cards]),
+                "tile": bool(buffer[players + num_players + index]),
+                "coins": buffer[players + index],
+                "bet_tiles": {
+                    camel: list(TILE_MASKS[mask])
+                    for camel, mask in zip(config.CAMELS, held)
+                    if mask
+                },
+                "name": name,
+            }
+        return player_dict
+
+    def bet_tile_items(self):
+        """Unpacked bet tiles left on the board
+
+        Returns
+        -------
+        dict
+            Dictionary with the bet tiles, same layout as `Game.bet_tiles`
+        """
+        _, _, taken, _, _ = self._offsets()
+        return {
+            camel: BET_TILES[self.buffer[taken + index] :]
+            for index, camel in enumerate(config.CAMELS)
+            if self.buffer[taken + index] < len(BET_TILES)
+        }
+
+    def tile_items(self):
+        """Unpacked tiles on the board
+
+        Returns
+        -------
+        dict
+            Dictionary with the tiles, same layout as `Game.tiles_dict`
+        """
+        _, _, _, tiles, _ = self._offsets()
+        return {
+            space: {
+                "tile_type": "block" if value & 1 else "skip",
+                "player": value >> 1,
+            }
+            for space, value in enumerate(self.buffer[tiles : tiles + TILE_SPACES])
+            if value
+        }
+
+    def bet_items(self):
+        """Unpacked winner and loser bets
+
+        Returns
+        -------
+        tuple of lists
+            Winner bets and loser bets, same layout as `Game.winner_bets`
+        """
+        _, _, _, _, bets = self._offsets()
+        size = self.num_players * len(config.CAMELS) + 1
+        result = []
+        for start in (bets, bets + size):
+            count = self.buffer[start]
+            result.append(
+                [
+                    (value >> 3, config.CAMELS[value & 7])
+                    for value in self.buffer[start + 1 : start + 1 + count]
+                ]
+            )
+        return tuple(result)
+
+    @property
+    def camel_dict(self):
+        """Read-only view of the camel positions"""
+        return MappingProxyType(self.camel_items())
+
+    @property
+    def player_dict(self):
+        """Read-only view of the player information"""
+        return MappingProxyType(self.player_items())
+
+    @property
+    def bet_tiles(self):
+        """Read-only view of the bet tiles left on the board"""
+        return MappingProxyType(self.bet_tile_items())
+
+    @property
+    def tiles_dict(self):
+        """Read-only view of the tiles on the board"""
+        return MappingProxyType(self.tile_items())
+
+    @property
+    def winner_bets(self):
+        """Winner bets in the order they were made"""
+        return tuple(self.bet_items()[0])
+
+    @property
+    def loser_bets(self):
+        """Loser bets in the order they were made"""
+        return tuple(self.bet_items()[1])
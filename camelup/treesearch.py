@@ -4,8 +4,12 @@
 
 import logging
 import sys
+import time
 
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
+from multiprocessing import Manager
 from operator import add
 
 import numpy as np
@@ -14,53 +18,586 @@ from numpy.lib.recfunctions import append_fields
 
 import camelup.camelup as camulup
 import camelup.config as config
+import camelup.evaluation as evaluation
+import camelup.gameplay as gameplay
+import camelup.markov as markov
+import camelup.simulation as simulation
 import camelup.utilities as util
+import camelup.zobrist as zobrist
+
+from camelup.counts import RaceCounts
+from camelup.dice import DiceBlock
+from camelup.zobrist import SharedTable, TranspositionTable
 
 
 logger = logging.getLogger(__name__)
 
 iter = 400
 
-CACHE = dict()
+exact = False
+
+precision = None
+
+common_dice = False
+
+prune = True
+
+halving = False
+
+dense_utility = False
+
+chance_samples = dict()
+
+chance_exact = 6
+
+batch_leaves = False
+
+canonical_cache = False
+
+class_stats = False
+
+relative_turns = False
+
+markov_game = False
+
+markov_tol = 1e-4
+
+SETTINGS = [
+    "iter",
+    "exact",
+    "precision",
+    "prune",
+    "batch_leaves",
+    "chance_samples",
+    "chance_exact",
+    "dense_utility",
+    "canonical_cache",
+    "relative_turns",
+    "markov_game",
+    "markov_tol",
+]
+
+LEAF_BATCH_RACES = 2 ** 17
+
+PLY_GAIN = max(config.BET_POINTS[0], config.BET_SCALING[0])
+
+CACHE_BYTES = 64 * 2 ** 20
+
+CACHE = TranspositionTable(CACHE_BYTES)
+
+CACHE_CLASSES = dict()
+
+CANONICAL_KEYS_SIZE = 2 ** 16
+
+CANONICAL_KEYS = dict()
 
+WorkerPool = namedtuple("WorkerPool", ["executor", "manager", "shared"])
 
-def get_move(game, MAX_DEPTH=1):
+
+class SearchTimeout(Exception):
+    """Raised at a leaf once the deadline of a budgeted search has passed"""
+
+
+def get_move(game, MAX_DEPTH=1, dice=None, budget_ms=None, workers=None, info=None):
     """Recommends the most optimal move
 
+    With `batch_leaves` set the leaves are simulated together before the search,
+    see `prefetch_leaves`, unless `exact`, `precision` or common dice are used.
+
+    With `halving` set and a `MAX_DEPTH` of 1 the simulations are raced between
+    the moves instead, see `halving_values`, and the simulations run for each
+    move are added to `info`.
+
+    With a `budget_ms` the tree is searched to depth 1, 2, ... up to `MAX_DEPTH`,
+    each iteration trying the moves in the order of the previous one's values so
+    the best move sets the pruning bound early. An iteration that runs out of
+    time is dropped, only the first one keeps the moves it finished, at least one.
+
     Parameters
     ----------
     game : camel up game
         Camel up game class
     MAX_DEPTH : int
-        Depth of tree to be built, 1 is recommended for performance considerations
+        Depth of tree to be built, 1 is recommended for performance considerations,
+        the deepest iteration with a `budget_ms`
+    dice : DiceBlock
+        Common dice shared by every leaf evaluation, a fresh block is drawn when
+        None and `common_dice` is set
+    budget_ms : float
+        Wall time budget in milliseconds, None to search `MAX_DEPTH` in full
+    workers : int
+        Processes the root moves are spread over, started once for the whole call,
+        see `start_pool` and `parallel_values`, None to search in this process,
+        the processes of the monte carlo with `halving`
+    info : dict
+        Dictionary the `iter`, `error` and `round` of each move are added to with
+        `halving`, see `halving_values`
 
     Returns
     -------
     dict
-        Dictionary of move and their corresponding expected value in coins
+        Dictionary of `Move` and their corresponding expected value in coins,
+        with `prune` set a roll that can't beat the best move holds an upper
+        bound on its value instead
+    int
+        Only with a `budget_ms`, depth of the last finished iteration, 0 when
+        even the first one ran out of time
 
     """
+    game = game.copy()
+    logger.info("Finding Best Move")
+    if dice is None and common_dice:
+        dice = DiceBlock()
+    moves = game.legal_moves(pruned=True)
+    if halving and MAX_DEPTH == 1 and budget_ms is None:
+        results, move_info = halving_values(game, iter, dice=dice, workers=workers)
+        if info is not None:
+            info.update(move_info)
+        return results
+    pool = start_pool(workers) if workers else None
+    try:
+        if budget_ms is None:
+            if batch_leaves and not exact and precision is None and dice is None:
+                prefetch_leaves(game, frontier(game, moves, MAX_DEPTH), iter)
+            return root_values(game, moves, MAX_DEPTH, dice=dice, pool=pool)
+        deadline = time.perf_counter() + budget_ms / 1000
+        results = dict()
+        for depth in range(1, MAX_DEPTH + 1):
+            values = dict()
+            if depth == 1:
+                root_values(game, moves[:1], depth, dice=dice, out=values, pool=pool)
+            try:
+                root_values(
+                    game,
+                    moves[len(values) :],
+                    depth,
+                    dice=dice,
+                    deadline=deadline,
+                    out=values,
+                    pool=pool,
+                )
+            except SearchTimeout:
+                logger.info(f"Out of time at depth {depth}")
+                if not results:
+                    return values, 0
+                return results, depth - 1
+            results = values
+            moves = sorted(results, key=results.get, reverse=True)
+        return results, MAX_DEPTH
+    finally:
+        if pool is not None:
+            stop_pool(pool)
+
+
+def root_values(
+    game, moves, MAX_DEPTH, dice=None, deadline=None, out=None, workers=None, pool=None
+):
+    """Values of the moves at the root for the player whose turn it is
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class, searched with make and unmake
+    moves : list
+        `Move` to value, in the order they're searched
+    MAX_DEPTH : int
+        Depth of tree to be built
+    dice : DiceBlock
+        Common dice shared by every leaf evaluation, None for independent runs
+    deadline : float
+        `time.perf_counter` past which leaves raise `SearchTimeout`, None for no
+        limit
+    out : dict
+        Dictionary the values are added to as they're found, its moves set the
+        pruning bound for the rest
+    workers : int
+        Processes to spread the moves over, see `parallel_values`
+    pool : WorkerPool
+        Pool to spread the moves over instead, see `start_pool`
+
+    Returns
+    -------
+    dict
+        Dictionary of `Move` and their corresponding expected value in coins
+    """
+    if workers or pool is not None:
+        return parallel_values(
+            game,
+            moves,
+            MAX_DEPTH,
+            workers,
+            dice=dice,
+            deadline=deadline,
+            out=out,
+            pool=pool,
+        )
     depth = 0
-    best_value = 0
-    best_move = None
     player = game.state
-    logger.info("Finding Best Move")
-    results = dict()
-    for move in game.available_moves_pruned().values():
+    results = dict() if out is None else out
+    if MAX_DEPTH == 1:
+        for move, val in leaf_values(game, moves, dice, deadline).items():
+            results[move] = val[player - 1]
+    for move in moves:
+        if move in results:
+            continue
         logger.info(f"Get Move, Depth: {depth}, Move: {move}, Player: {player}")
-        val = value(game, move, depth, player, MAX_DEPTH)[player - 1]
-        results[move] = val
+        alpha = max(results.values()) if prune and results else None
+        val = value(
+            game,
+            move,
+            depth,
+            player,
+            MAX_DEPTH,
+            dice=dice,
+            alpha=alpha,
+            deadline=deadline,
+        )
+        results[move] = val[player - 1]
     return results
 
 
-def value(game, move, depth, player, MAX_DEPTH):
+def parallel_values(
+    game, moves, MAX_DEPTH, workers, dice=None, deadline=None, out=None, pool=None
+):
+    """Values of the moves at the root, searched in a pool of processes
+
+    Every move is a task, except a roll which is a task for each of its outcomes
+    so the largest subtree is spread out as well. The processes share the leaf
+    probabilities through a `SharedTable`, a position simulated by one isn't
+    simulated by the others, and they're added to `CACHE` when the pool stops.
+    Moves aren't pruned at the root as their values come back in any order.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    moves : list
+        `Move` to value
+    MAX_DEPTH : int
+        Depth of tree to be built
+    workers : int
+        Number of processes of the pool started for the call when `pool` is None
+    dice : DiceBlock
+        Common dice shared by every leaf evaluation, None for independent runs
+    deadline : float
+        `time.perf_counter` past which leaves raise `SearchTimeout`, None for no
+        limit
+    out : dict
+        Dictionary the values are added to, on a `SearchTimeout` it keeps the
+        moves that finished
+    pool : WorkerPool
+        Pool started by `start_pool` and left running, so `get_move` keeps the
+        same processes over every iteration
+
+    Returns
+    -------
+    dict
+        Dictionary of `Move` and their corresponding expected value in coins
+    """
+    player = game.state
+    state = game.get_state()
+    results = dict() if out is None else out
+    tasks = []
+    for move in moves:
+        if move.kind == "roll":
+            tasks += [
+                (move, move._replace(camel=key, roll=die))
+                for key, val in game.camel_dict.items()
+                if val["need_roll"]
+                for die in range(1, 4)
+            ]
+        else:
+            tasks.append((move, move))
+    outcomes = {move: [] for move in moves}
+    sizes = {move: 0 for move in moves}
+    for move, _ in tasks:
+        sizes[move] += 1
+    own_pool = pool is None
+    if own_pool:
+        pool = start_pool(workers)
+    futures = dict()
+    try:
+        futures = {
+            pool.executor.submit(
+                _subtree_value, state, play, MAX_DEPTH, dice, deadline
+            ): move
+            for move, play in tasks
+        }
+        for future in as_completed(futures):
+            outcomes[futures[future]].append(future.result()[player - 1])
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_pool:
+            stop_pool(pool)
+        for move in moves:
+            if len(outcomes[move]) == sizes[move]:
+                results[move] = sum(outcomes[move]) / sizes[move]
+    return results
+
+
+def start_pool(workers):
+    """Starts the processes `parallel_values` spreads the moves over
+
+    The search settings named in `SETTINGS` are copied into each process when it
+    starts, so they hold for as long as the pool runs.
+
+    Parameters
+    ----------
+    workers : int
+        Number of processes
+
+    Returns
+    -------
+    WorkerPool
+        The executor, and the manager and dictionary behind the `SharedTable` of
+        the processes
+    """
+    settings = {name: globals()[name] for name in SETTINGS}
+    manager = Manager()
+    shared = manager.dict()
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(settings, shared)
+    )
+    return WorkerPool(executor, manager, shared)
+
+
+def stop_pool(pool):
+    """Stops a pool from `start_pool` and adds the leaves it shared to `CACHE`
+
+    Parameters
+    ----------
+    pool : WorkerPool
+        Pool to stop
+    """
+    pool.executor.shutdown()
+    for key, entry in pool.shared.items():
+        CACHE.put(key, *entry)
+    pool.manager.shutdown()
+
+
+def frontier(game, moves, MAX_DEPTH, depth=0, leaves=None):
+    """Distinct boards at the leaves the search reaches below the moves
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class, walked with make and unmake
+    moves : list
+        `Move` to expand, rolls expand to every outcome
+    MAX_DEPTH : int
+        Depth of tree to be built
+    depth : int
+        The current depth in the tree
+    leaves : dict
+        Dictionary the boards are added to
+
+    Returns
+    -------
+    dict
+        Dictionary of `position_key` and the key, camel and tiles dictionaries of
+        the board
+    """
+    leaves = dict() if leaves is None else leaves
+    for move in moves:
+        if move.kind == "roll":
+            plays = [
+                move._replace(camel=key, roll=die)
+                for key, val in game.camel_dict.items()
+                if val["need_roll"]
+                for die in range(1, 4)
+            ]
+        else:
+            plays = [move]
+        for play in plays:
+            output, undo = game.make(play)
+            if output != "Done" and depth + 1 < MAX_DEPTH:
+                moves_below = game.legal_moves(pruned=True)
+                frontier(game, moves_below, MAX_DEPTH, depth + 1, leaves)
+            elif output != "Done" and game.position_key not in leaves:
+                leaves[game.position_key] = (
+                    game.position_key,
+                    {camel: dict(val) for camel, val in game.camel_dict.items()},
+                    dict(game.tiles_dict),
+                )
+            game.unmake(undo)
+    return leaves
+
+
+def prefetch_leaves(game, leaves, iter):
+    """Simulates the leaves missing from `CACHE` together and caches them
+
+    The boards are simulated with `simulation.board_counts`, up to
+    `LEAF_BATCH_RACES` races at a time, to the end of the leg for the turn
+    probabilities and to the end of the game for the game probabilities, so
+    `calc_utility_np` finds every leaf in the cache. Boards sharing a key, e.g.
+    the same leg further up the track, are simulated once.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class, its generator draws the dice
+    leaves : dict
+        Boards by `position_key`, as returned by `frontier`
+    iter : int
+        Iterations to run the monte carlo simulations for each board
+    """
+    camels = [*game.camel_dict.keys()]
+    chunk = max(LEAF_BATCH_RACES // iter, 1)
+    for kind, max_legs, probs_from_counts, watch in (
+        ("turn", 1, turn_probs_from_counts, [[1], [2]]),
+        ("game", None, game_probs_from_counts, [[1], [len(camels)]]),
+    ):
+        missing = dict()
+        for board in leaves.values():
+            key = cache_key(*board, kind)[0]
+            if key not in CACHE:
+                missing.setdefault(key, board)
+        boards = [*missing.values()]
+        logger.info(f"Simulating {len(boards)} {kind} of {len(leaves)} leaves")
+        for start in range(0, len(boards), chunk):
+            batch = boards[start : start + chunk]
+            rng = game.rng.generator
+            counts = simulation.board_counts(
+                [board[1:] for board in batch], camels, iter, rng, max_legs
+            )
+            for board, board_counts in zip(batch, counts):
+                info = {"iter": iter, "error": board_counts.half_width(watch)}
+                cache_put(*board, kind, probs_from_counts(board_counts), info)
+
+
+def halving_values(game, iter, dice=None, workers=None):
+    """Values of the moves at the root with the simulations raced between them
+
+    Successive halving: every move starts with a few simulations at each of its
+    leaves, the worse half is dropped after each round and the simulations of the
+    rest are doubled, so only the last two get all of `iter`. Leaves keep their
+    counts between rounds and moves leaving the camels and tiles alone share the
+    same leaf, so no simulation is run twice.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    iter : int
+        Simulations at each leaf of the last round
+    dice : DiceBlock
+        Common dice shared by every leaf, None for independent runs
+    workers : int
+        Number of processes for the monte carlo, None runs it in this process
+
+    Returns
+    -------
+    dict
+        Dictionary of `Move` and their expected value in coins, for a dropped
+        move the value in the round it was dropped
+    dict
+        Dictionary of `Move` and the `iter` simulations at its leaves, the widest
+        95% confidence interval half-width of their probabilities (`error`) and
+        the `round` it was dropped in, None for the moves left at the end
+    """
+    player = game.state
+    game = game.copy()
+    moves = game.legal_moves(pruned=True)
+    rounds = max((len(moves) - 1).bit_length(), 1)
+    leaves = dict()
+    results = dict()
+    info = dict()
+    for num_round in range(rounds):
+        target = max(iter >> (rounds - 1 - num_round), 1)
+        for move in moves:
+            val, info[move] = _halving_value(game, move, target, leaves, dice, workers)
+            results[move] = val[player - 1]
+            info[move]["round"] = None
+        moves = sorted(moves, key=results.get, reverse=True)
+        for move in moves[(len(moves) + 1) // 2 :]:
+            info[move]["round"] = num_round
+        logger.info(f"Round {num_round}: {target} simulations, {len(moves)} moves")
+        moves = moves[: (len(moves) + 1) // 2]
+    return results, info
+
+
+def _halving_value(game, move, target, leaves, dice=None, workers=None):
+    """
+    Value of a move after topping up the counts of its leaves to `target`
+    """
+    if move.kind == "roll":
+        plays = [
+            move._replace(camel=key, roll=die)
+            for key, val in game.camel_dict.items()
+            if val["need_roll"]
+            for die in range(1, 4)
+        ]
+    else:
+        plays = [move]
+    outcomes = [0] * game.num_players
+    info = {"iter": target, "error": 0.0}
+    for play in plays:
+        output, undo = game.make(play)
+        if output == "Done":
+            utility = [val["coins"] for val in game.player_dict.values()]
+        else:
+            key = game.position_key
+            if key not in leaves:
+                leaves[key] = (RaceCounts(game.camel_dict), RaceCounts(game.camel_dict))
+            turn_counts, game_counts = leaves[key]
+            for kind, counts in (("turn", turn_counts), ("game", game_counts)):
+                if counts.n < target:
+                    game.monte_counts(
+                        kind,
+                        game.camel_dict,
+                        game.tiles_dict,
+                        target,
+                        workers,
+                        dice=dice,
+                        counts=counts,
+                    )
+            num_camels = len(game.camel_dict)
+            error = max(
+                turn_counts.half_width([[1], [2]]),
+                game_counts.half_width([[1], [num_camels]]),
+            )
+            info["error"] = max(info["error"], error)
+            turn_probs = turn_probs_from_counts(turn_counts)
+            game_probs = game_probs_from_counts(game_counts)
+            if dense_utility:
+                utility = dense_utility_array(game, turn_probs, game_probs)
+            else:
+                utility = position_utility(game, turn_probs, game_probs)
+            utility = utility["utility"]
+        game.unmake(undo)
+        outcomes = list(map(add, outcomes, utility))
+    return list(map(lambda x: x / len(plays), outcomes)), info
+
+
+def _init_worker(settings, shared):
+    """
+    Copies the search settings named in `SETTINGS` into a worker process and
+    shares its cache
+    """
+    global CACHE
+    globals().update(settings)
+    CACHE = SharedTable(shared, CACHE)
+
+
+def _subtree_value(state, move, MAX_DEPTH, dice=None, deadline=None):
+    """
+    Value of a root move, or a root roll outcome, for all players in a worker
+    """
+    game = camulup.Game.from_state(state)
+    if game.play(move) == "Done":
+        return [val["coins"] for val in game.player_dict.values()]
+    return max_value(game, 1, MAX_DEPTH, dice=dice, deadline=deadline)
+
+
+def value(game, move, depth, player, MAX_DEPTH, dice=None, alpha=None, deadline=None):
     """Value function for recursive multi agent utility
 
     Parameters
     ----------
     game : camel up game
         Camel up game class
-    move : str
+    move : Move
         The move that is being assessed for value
     depth : int
         The current depth in the tree
@@ -68,6 +605,14 @@ def value(game, move, depth, player, MAX_DEPTH):
         The current player in the tree
     MAX_DEPTH : int
         Depth of tree to be built, 1 is recommended for performance considerations
+    dice : DiceBlock
+        Common dice shared by every leaf evaluation, None for independent runs
+    alpha : float
+        Best value `player` already has at the parent, a roll that can't beat it
+        is cut off early, see `exp_value`
+    deadline : float
+        `time.perf_counter` past which leaves raise `SearchTimeout`, None for no
+        limit
 
     Returns
     -------
@@ -76,17 +621,26 @@ def value(game, move, depth, player, MAX_DEPTH):
 
     """
     logger.info(f"Value, Depth: {depth}, Move: {move}, Player: {player}")
-    if "roll" in move:
+    if move.kind == "roll":
         logger.info(f"Return Expected Value")
-        return exp_value(game, depth + 1, MAX_DEPTH)
+        return exp_value(
+            game,
+            depth + 1,
+            MAX_DEPTH,
+            dice=dice,
+            alpha=alpha,
+            player=player,
+            deadline=deadline,
+        )
     else:
         logger.info(f"Return Max Value")
-        game_branch = deepcopy(game)
-        game_branch.play(move)
-        return max_value(game_branch, depth + 1, MAX_DEPTH)
+        undo = game.make(move)[1]
+        max_val = max_value(game, depth + 1, MAX_DEPTH, dice=dice, deadline=deadline)
+        game.unmake(undo)
+        return max_val
 
 
-def max_value(game, depth, MAX_DEPTH):
+def max_value(game, depth, MAX_DEPTH, dice=None, deadline=None):
     """Calculate the max value from all possible plays
 
     Parameters
@@ -97,6 +651,11 @@ def max_value(game, depth, MAX_DEPTH):
         The current depth in the tree
     MAX_DEPTH : int
         Depth of tree to be built, 1 is recommended for performance considerations
+    dice : DiceBlock
+        Common dice shared by every leaf evaluation, None for independent runs
+    deadline : float
+        `time.perf_counter` past which leaves raise `SearchTimeout`, None for no
+        limit
 
     Returns
     -------
@@ -105,21 +664,55 @@ def max_value(game, depth, MAX_DEPTH):
 
     """
     if depth == MAX_DEPTH:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout
         logger.info(f"Return Utility")
-        return list(calc_utility_np(game, iter)["utility"])
+        utility = calc_utility_np(
+            game, iter, exact=exact, precision=precision, dice=dice
+        )
+        return list(utility["utility"])
     else:
         playing_player = game.state
-        values = [
-            value(game, move, depth, playing_player, MAX_DEPTH)
-            for move in game.available_moves_pruned().values()
-        ]
-        print(values)
+        moves = game.legal_moves(pruned=True)
+        batched = dict()
+        if depth + 1 == MAX_DEPTH:
+            batched = leaf_values(game, moves, dice=dice, deadline=deadline)
+        values = []
+        for move in moves:
+            if move in batched:
+                values.append(batched[move])
+                continue
+            known = values + [*batched.values()]
+            alpha = None
+            if prune and known:
+                alpha = max(val[playing_player - 1] for val in known)
+            values.append(
+                value(
+                    game,
+                    move,
+                    depth,
+                    playing_player,
+                    MAX_DEPTH,
+                    dice=dice,
+                    alpha=alpha,
+                    deadline=deadline,
+                )
+            )
+        logger.debug(values)
         return util.return_max_value(values, playing_player - 1)
 
 
-def exp_value(game, depth, MAX_DEPTH):
+def exp_value(
+    game, depth, MAX_DEPTH, dice=None, alpha=None, player=None, deadline=None
+):
     """Calculate the expected value from a roll play
 
+    The outcomes expanded are all of them or a sample, see `chance_outcomes`.
+
+    With an `alpha` the outcomes are cut off (Star1) as soon as the average can't
+    beat it for `player` even if every remaining outcome reaches the bound from
+    `utility_bound`. The value returned then holds that upper bound for `player`.
+
     Parameters
     ----------
     game : camel up game
@@ -128,6 +721,15 @@ def exp_value(game, depth, MAX_DEPTH):
         The current depth in the tree
     MAX_DEPTH : int
         Depth of tree to be built, 1 is recommended for performance considerations
+    dice : DiceBlock
+        Common dice shared by every leaf evaluation, None for independent runs
+    alpha : float
+        Best value `player` already has at the parent max node
+    player : int
+        Player choosing between the roll and its siblings
+    deadline : float
+        `time.perf_counter` past which leaves raise `SearchTimeout`, None for no
+        limit
 
     Returns
     -------
@@ -136,24 +738,105 @@ def exp_value(game, depth, MAX_DEPTH):
 
     """
     outcomes = [0] * game.num_players
-    num_outcomes = 0
-    for key, val in game.camel_dict.items():
-        if val["need_roll"]:
-            for die in range(0, 3):
-                logger.info(f"Outcome for Camel: {key} And Roll: {die+1}")
-                game_branch = deepcopy(game)
-                outcome = game_branch.play(f"self.play_roll('{key}',{die+1})")
-                if outcome == "Done":
-                    max_val = [val["coins"] for val in game_branch.player_dict.values()]
-                else:
-                    max_val = max_value(game_branch, depth, MAX_DEPTH)
-                outcomes = list(map(add, outcomes, max_val))
-                num_outcomes += 1
+    rolls = chance_outcomes(game, depth)
+    remaining = 1.0
+    if alpha is not None:
+        bound = utility_bound(game, player, MAX_DEPTH - depth)
+    for num_outcomes, (key, die, weight) in enumerate(rolls, 1):
+        logger.info(f"Outcome for Camel: {key} And Roll: {die}")
+        outcome, undo = game.make(camulup.Move("roll", key, roll=die))
+        if outcome == "Done":
+            max_val = [val["coins"] for val in game.player_dict.values()]
+        else:
+            max_val = max_value(game, depth, MAX_DEPTH, dice=dice, deadline=deadline)
+        game.unmake(undo)
+        outcomes = [total + weight * val for total, val in zip(outcomes, max_val)]
+        remaining -= weight
+        if alpha is not None and num_outcomes < len(rolls):
+            best = outcomes[player - 1] + remaining * bound
+            if best < alpha:
+                logger.info(f"Star1 cutoff after {num_outcomes} of {len(rolls)}")
+                outcomes[player - 1] = best
+                break
     logger.info(f"{outcomes}")
-    return list(map(lambda x: x / num_outcomes, outcomes))
+    return outcomes
+
+
+def chance_outcomes(game, depth):
+    """Outcomes of a roll to expand and their weights
+
+    Every camel that needs a roll with every die, unless `chance_samples` has a
+    number of samples for the `depth` and there are more than `chance_exact`
+    outcomes. Then the samples are split evenly between the camels, the rest
+    going to camels drawn at random, and each camel's dice are drawn without
+    replacement. Each sample is weighted by its camel's share over the samples
+    the camel got, so the average stays unbiased.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    depth : int
+        The current depth in the tree
 
+    Returns
+    -------
+    list of tuples
+        Camel, die and weight of each outcome, the weights add up to 1
+    """
+    camels = [key for key, val in game.camel_dict.items() if val["need_roll"]]
+    samples = chance_samples.get(depth)
+    if samples is None or len(camels) * 3 <= max(samples, chance_exact):
+        weight = 1 / (len(camels) * 3)
+        return [(key, die, weight) for key in camels for die in range(1, 4)]
+    counts = [samples // len(camels)] * len(camels)
+    if not counts[0]:
+        counts = [1] * len(camels)
+    else:
+        for index in game.rng.permutation(len(camels))[: samples % len(camels)]:
+            counts[index] += 1
+    rolls = []
+    for key, count in zip(camels, counts):
+        dice = game.rng.permutation(3)[:count]
+        rolls += [(key, die + 1, 1 / (len(camels) * count)) for die in dice]
+    return rolls
+
+
+def utility_bound(game, player, plies):
+    """Upper bound on the utility of a player rolling now at any leaf after it
+
+    The roll pays a coin and only the player's own moves within `plies` can add
+    more than that, at most `PLY_GAIN` each. Bet tiles count at their full value
+    and game bets at `PLY_GAIN`. Tile points need a tile on the board, every roll
+    within `plies` and every camel left to roll afterwards pays at most a point.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    player : int
+        Player about to roll
+    plies : int
+        Moves after the roll to the leaves
 
-def calc_utility_np(game, iter):
+    Returns
+    -------
+    float
+        Upper bound on the utility
+    """
+    val = game.player_dict[player]
+    held = sum(sum(tiles) for tiles in val["bet_tiles"].values())
+    bets = [*game.winner_bets, *game.loser_bets]
+    num_bets = sum(bet[0] == player for bet in bets)
+    own_moves = plies // game.num_players
+    tiles = [tile["player"] for tile in game.tiles_dict.values()]
+    tile_points = 0
+    if player in tiles or own_moves:
+        tile_points = len(game.camel_dict) + plies
+    return val["coins"] + 1 + held + tile_points + PLY_GAIN * (num_bets + own_moves)
+
+
+def calc_utility_np(game, iter, exact=False, precision=None, dice=None):
     """Calc utility of current position
 
     Parameters
@@ -161,37 +844,401 @@ def calc_utility_np(game, iter):
     game : camel up game
         Camel up game class
     iter : int
-        Iterations to run the monte carlo simulations
+        Iterations to run the monte carlo simulations, the cap when `precision` is
+        given
+    exact : bool
+        Enumerate the turn exactly instead of running the turn monte carlo
+    precision : float
+        Target 95% confidence interval half-width of the monte carlo
+        probabilities, None runs all of `iter`
+    dice : DiceBlock
+        Common dice for the monte carlo, None for an independent run
 
     Returns
     -------
     np.array
-        Numpy structured array with expected utilities
+        Numpy structured array with expected utilities, see `dense_utility_array`
+        or `position_utility` without `dense_utility`
 
     """
-    coins = coins_to_numpy(game)
-    if str(game.camel_dict) + str(game.tiles_dict) in CACHE.keys():
-        turn_prob_first, turn_prob_second, turn_prob_other, exp_tile_points = CACHE[
-            str(game.camel_dict) + str(game.tiles_dict)
-        ][0]
-        game_prob_first, game_prob_last = CACHE[
-            str(game.camel_dict) + str(game.tiles_dict)
-        ][1]
+    return calc_utility_info(game, iter, exact, precision, dice)[0]
+
+
+def calc_utility_info(game, iter, exact=False, precision=None, dice=None):
+    """Utility of the current position with the simulations behind it
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    iter : int
+        Iterations to run the monte carlo simulations, the cap when `precision` is
+        given
+    exact : bool
+        Enumerate the turn exactly instead of running the turn monte carlo
+    precision : float
+        Target 95% confidence interval half-width of the monte carlo
+        probabilities, None runs all of `iter`
+    dice : DiceBlock
+        Common dice for the monte carlo, None for an independent run
+
+    Returns
+    -------
+    np.array
+        Numpy structured array with expected utilities, as `calc_utility_np`
+    dict
+        Dictionary with the `turn` and `game` simulations run and half-widths
+        reached, see `leaf_probs`
+    """
+    turn_probs, game_probs, info = leaf_probs(
+        game, iter, exact=exact, precision=precision, dice=dice
+    )
+    if dense_utility:
+        final = dense_utility_array(game, turn_probs, game_probs)
     else:
-        turn_prob_first, turn_prob_second, turn_prob_other, exp_tile_points = turn_prob_numpy(
-            game, iter
+        final = position_utility(game, turn_probs, game_probs)
+    return final, info
+
+
+def leaf_probs(game, iter, exact=False, precision=None, dice=None):
+    """Probabilities of the current position, from `CACHE` or the monte carlo
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    iter : int
+        Iterations to run the monte carlo simulations, the cap when `precision` is
+        given
+    exact : bool
+        Enumerate the turn exactly instead of running the turn monte carlo
+    precision : float
+        Target 95% confidence interval half-width of the monte carlo
+        probabilities, None runs all of `iter`
+    dice : DiceBlock
+        Common dice for the monte carlo, None for an independent run
+
+    Returns
+    -------
+    tuple
+        Turn probabilities as returned by `turn_prob_numpy`, game probabilities as
+        returned by `game_prob_numpy` and a dict with the `turn` and `game`
+        simulations run and half-widths reached, see `turn_prob_info` and
+        `game_prob_info`
+    """
+    board = (game.position_key, game.camel_dict, game.tiles_dict)
+    turn_entry = cache_get(game, "turn")
+    if turn_entry is None:
+        turn_entry = turn_prob_info(
+            game, iter, exact=exact, precision=precision, dice=dice
         )
-        game_prob_first, game_prob_last = game_prob_numpy(game, iter)
-        game_prob_first["prob"] = np.where(
-            game_prob_first["prob"] < 0.30, 0, game_prob_first["prob"]
+        cache_put(*board, "turn", *turn_entry)
+    game_entry = cache_get(game, "game")
+    if game_entry is None:
+        game_entry = game_prob_info(
+            game,
+            iter,
+            precision=precision,
+            dice=dice,
+            markov_chain=markov_game,
+            tol=markov_tol,
         )
-        game_prob_last["prob"] = np.where(
-            game_prob_last["prob"] < 0.30, 0, game_prob_last["prob"]
+        cache_put(*board, "game", *game_entry)
+    info = {"turn": turn_entry[1], "game": game_entry[1]}
+    return turn_entry[0], game_entry[0], info
+
+
+def cache_key(position_key, camel_dict, tiles_dict, kind):
+    """Key of the turn or game probabilities of a position in `CACHE`
+
+    The key is built on the game's `position_key`, kept up to date by the moves,
+    rather than hashed from the dicts. With `canonical_cache` positions that only
+    differ by the colours of the camels share a key, see `zobrist.canonical_hash`,
+    and the camels are stored under their index in the canonical order. With
+    `relative_turns` as well the turn probabilities are keyed by `zobrist.leg_hash`
+    while no camel can reach the finish this leg, the same leg further up the
+    track shares a key. Both are hashed from the dicts once per position and kept
+    in `CANONICAL_KEYS` by `position_key` and `relative_turns`.
+
+    Parameters
+    ----------
+    position_key : int
+        Zobrist hash of the position, see `Game.position_key`
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    kind : str
+        `turn` or `game` probabilities
+
+    Returns
+    -------
+    int
+        Key of the probabilities
+    dict
+        Dictionary of camel and its label in the cache
+    """
+    position_key ^= zobrist.feature_key(kind)
+    if not canonical_cache:
+        return position_key, {camel: camel for camel in camel_dict}
+    cached = CANONICAL_KEYS.get((position_key, relative_turns))
+    if cached is not None:
+        return cached
+    reach = gameplay.leg_reach(camel_dict, tiles_dict)
+    if kind == "turn" and relative_turns and reach <= simulation.FINISH:
+        key, camels = zobrist.leg_hash(camel_dict, tiles_dict, reach)
+    else:
+        key, camels = zobrist.canonical_hash(camel_dict, tiles_dict)
+    labels = {camel: str(index) for index, camel in enumerate(camels)}
+    if len(CANONICAL_KEYS) >= CANONICAL_KEYS_SIZE:
+        CANONICAL_KEYS.clear()
+    cached = (key ^ zobrist.feature_key(kind), labels)
+    CANONICAL_KEYS[position_key, relative_turns] = cached
+    return cached
+
+
+def cache_get(game, kind):
+    """Turn or game probabilities of the position from `CACHE`, in its own colours
+
+    With `class_stats` every lookup is counted in `CACHE_CLASSES`, see
+    `cache_report`.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    kind : str
+        `turn` or `game` probabilities
+
+    Returns
+    -------
+    tuple
+        Probabilities as returned by `turn_prob_numpy` or `game_prob_numpy` and
+        the simulations run and half-width reached, or None on a miss
+    """
+    key, labels = cache_key(
+        game.position_key, game.camel_dict, game.tiles_dict, kind
+    )
+    cached = CACHE.get(key)
+    if class_stats:
+        position = game.position_key
+        stats = CACHE_CLASSES.get(key)
+        if stats is None:
+            stats = CACHE_CLASSES[key] = {
+                "kind": kind,
+                "lookups": 0,
+                "hits": 0,
+                "position": position,
+                "twins": 0,
+            }
+        stats["lookups"] += 1
+        stats["hits"] += cached is not None
+        stats["twins"] += position != stats["position"]
+    if cached is None:
+        return None
+    probs, info = cached
+    return relabel(probs, {label: camel for camel, label in labels.items()}), info
+
+
+def cache_put(position_key, camel_dict, tiles_dict, kind, probs, info=None):
+    """Stores the turn or game probabilities of a position in `CACHE`
+
+    Parameters
+    ----------
+    position_key : int
+        Zobrist hash of the position, see `Game.position_key`
+    camel_dict : nested dict
+        Dictionary with camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    kind : str
+        `turn` or `game` probabilities
+    probs : tuple
+        Probabilities as returned by `turn_prob_numpy` or `game_prob_numpy`
+    info : dict
+        Simulations run and half-width reached, see `turn_prob_info` and
+        `game_prob_info`
+    """
+    key, labels = cache_key(position_key, camel_dict, tiles_dict, kind)
+    probs = relabel(probs, labels)
+    CACHE.put(key, (probs, info), sum(array.nbytes for array in probs))
+
+
+def relabel(arrays, labels):
+    """Copies of probability arrays with their camels renamed
+
+    The copies don't share their dtype with the originals, so renaming their
+    columns in place, as `position_utility` does, leaves the originals alone.
+
+    Parameters
+    ----------
+    arrays : tuple
+        Numpy structured arrays, the ones with a `camel` column are renamed
+    labels : dict
+        Dictionary of camel and its new name
+
+    Returns
+    -------
+    tuple
+        Renamed arrays
+    """
+    renamed = []
+    for array in arrays:
+        array = array.astype(np.dtype(array.dtype.descr))
+        if "camel" in array.dtype.names:
+            array["camel"] = [labels[camel] for camel in array["camel"]]
+        renamed.append(array)
+    return tuple(renamed)
+
+
+def cache_report(top=None):
+    """Hit rates of `CACHE` lookups by canonical class
+
+    A class is every position sharing a `cache_key`, with `canonical_cache` the
+    positions that are the same race up to the colours of the camels, and with
+    `relative_turns` for the turn probabilities the same leg anywhere on the
+    track. Lookups are only counted with `class_stats` set, and `CACHE_CLASSES`
+    keeps a record for every class looked up until it's cleared, so it's meant
+    for profiling rather than long runs.
+
+    Parameters
+    ----------
+    top : int
+        Number of classes to report, the most looked up first, None for all
+
+    Returns
+    -------
+    list
+        Dictionaries with the `key` and `kind` of the class, its `lookups`, `hits`
+        and `hit_rate`, and the number of `twins`, lookups from a position other
+        than the first one looked up in it
+    """
+    classes = sorted(
+        CACHE_CLASSES.items(), key=lambda item: item[1]["lookups"], reverse=True
+    )
+    report = [
+        {
+            "key": key,
+            "kind": stats["kind"],
+            "lookups": stats["lookups"],
+            "hits": stats["hits"],
+            "hit_rate": stats["hits"] / stats["lookups"],
+            "twins": stats["twins"],
+        }
+        for key, stats in classes[:top]
+    ]
+    lookups = sum(stats["lookups"] for stats in CACHE_CLASSES.values())
+    hits = sum(stats["hits"] for stats in CACHE_CLASSES.values())
+    twins = sum(stats["twins"] > 0 for stats in CACHE_CLASSES.values())
+    logger.info(
+        f"Cache: {hits} hits in {lookups} lookups over {len(CACHE_CLASSES)} "
+        f"classes, {twins} looked up for more than one position"
+    )
+    return report
+
+
+def dense_utility_array(game, turn_probs, game_probs):
+    """Utility of each player from the probabilities with the dense model
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    turn_probs : tuple
+        Turn probabilities, as returned by `turn_prob_numpy`
+    game_probs : tuple
+        Game probabilities, as returned by `game_prob_numpy`
+
+    Returns
+    -------
+    np.array
+        Numpy structured array with the utility of each player, see
+        `evaluation.utilities`
+    """
+    probs, tile_points = evaluation.encode_probs(
+        turn_probs, game_probs, game.num_players
+    )
+    utility = evaluation.utilities(evaluation.encode(game), probs, tile_points)
+    return np.array(
+        [*zip(range(1, game.num_players + 1), utility)],
+        dtype=[("player", float), ("utility", float)],
+    )
+
+
+def leaf_values(game, moves, dice=None, deadline=None):
+    """Values of moves whose children are leaves, evaluated in one batch
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class, searched with make and unmake
+    moves : list
+        `Move` to value, rolls aren't batched and are skipped
+    dice : DiceBlock
+        Common dice for the monte carlo, None for an independent run
+    deadline : float
+        `time.perf_counter` past which `SearchTimeout` is raised, None for no
+        limit
+
+    Returns
+    -------
+    dict
+        Dictionary of `Move` and the utility of every player, empty without
+        `dense_utility`
+    """
+    moves = [move for move in moves if move.kind != "roll"]
+    if not dense_utility or not moves:
+        return dict()
+    holdings, probs, tile_points = [], [], []
+    for move in moves:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout
+        undo = game.make(move)[1]
+        turn_probs, game_probs, _ = leaf_probs(
+            game, iter, exact=exact, precision=precision, dice=dice
         )
-        CACHE[str(game.camel_dict) + str(game.tiles_dict)] = [
-            (turn_prob_first, turn_prob_second, turn_prob_other, exp_tile_points),
-            (game_prob_first, game_prob_last),
-        ]
+        holdings.append(evaluation.encode(game))
+        leaf = evaluation.encode_probs(turn_probs, game_probs, game.num_players)
+        probs.append(leaf[0])
+        tile_points.append(leaf[1])
+        game.unmake(undo)
+    utility = evaluation.utilities(
+        evaluation.stack(holdings), np.stack(probs), np.stack(tile_points)
+    )
+    return {move: list(val) for move, val in zip(moves, utility)}
+
+
+def position_utility(game, turn_probs, game_probs):
+    """Utility of each player from the probabilities of the current position
+
+    Game bets only count the camels with at least a 30% chance, the arrays of
+    `game_probs` are updated in place.
+
+    Parameters
+    ----------
+    game : camel up game
+        Camel up game class
+    turn_probs : tuple
+        First, second and other place probabilities for the leg and the expected
+        tile points, as returned by `turn_prob_numpy`
+    game_probs : tuple
+        First and last place probabilities for the game, as returned by
+        `game_prob_numpy`
+
+    Returns
+    -------
+    np.array
+        Numpy structured array with expected utilities
+    """
+    turn_prob_first, turn_prob_second, turn_prob_other, exp_tile_points = turn_probs
+    game_prob_first, game_prob_last = game_probs
+    game_prob_first["prob"] = np.where(
+        game_prob_first["prob"] < 0.30, 0, game_prob_first["prob"]
+    )
+    game_prob_last["prob"] = np.where(
+        game_prob_last["prob"] < 0.30, 0, game_prob_last["prob"]
+    )
+    coins = coins_to_numpy(game)
     winner_bets, loser_bets = winner_loser_bets_to_numpy(game)
     bet_tiles = bet_tiles_to_numpy(game)
     util.rename_np(turn_prob_first, ["counts", "prob"], "first")
@@ -248,8 +1295,7 @@ def calc_utility_np(game, iter):
         - final["exp_value_winner_other"]
         - final["exp_value_loser_other"]
     )
-    final = util.add_col_np(final, "utility", multiply_array)
-    return final
+    return util.add_col_np(final, "utility", multiply_array)
 
 
 def calc_exp_value_np(df, exp_value):
@@ -341,7 +1387,31 @@ def create_prob_array(result, iter):
     return append_fields(result_array, "prob", prob_array["prob"], usemask=False)
 
 
-def turn_prob_numpy(game, iter):
+def create_exact_prob_array(result):
+    """Create probability array from an exact distribution
+
+    Parameters
+    ----------
+    result : array
+        Array with the probability of each camel and place
+
+    Returns
+    -------
+    array
+        Numpy array, `counts` holds the probability mass
+
+    """
+    bins, inverse = np.unique(result["camel"], return_inverse=True)
+    probs = np.bincount(inverse, weights=result["prob"], minlength=len(bins))
+    return np.array(
+        [*zip(bins, probs, probs)],
+        dtype=[("camel", "U6"), ("counts", float), ("prob", float)],
+    )
+
+
+def turn_prob_numpy(
+    game, iter, exact=False, workers=None, seed=None, precision=None, dice=None
+):
     """Create turn probability arrays
 
     Parameters
@@ -349,27 +1419,80 @@ def turn_prob_numpy(game, iter):
     game : camel up game
         Camel up game class
     iter : int
-        Number of simulation iterations
+        Number of simulation iterations, the cap when `precision` is given
+    exact : bool
+        Enumerate the turn exactly, `iter` is ignored
+    workers : int
+        Number of processes for the monte carlo, None runs it in this process
+    seed : int
+        Seed of the monte carlo, None for fresh entropy
+    precision : float
+        Target 95% confidence interval half-width of the first and second place
+        probabilities, see `Game.monte_counts`
+    dice : DiceBlock
+        Common dice for the monte carlo, None for an independent run
 
     Returns
     -------
-    array
-        Numpy array
+    tuple
+        First, second and other place probabilities and expected tile points
 
     """
-    winner_result, tile_points_result = game.turn_monte(
-        game.camel_dict, game.tiles_dict, iter=iter
-    )
-    prob_first = create_prob_array(winner_result[winner_result["place"] == 1], iter)
-    prob_second = create_prob_array(winner_result[winner_result["place"] == 2], iter)
-    prob_other = create_prob_array(winner_result[winner_result["place"] > 2], iter)
-    exp_tile_points = util.numpy_group_by_sum(tile_points_result, "player", "points")
-    multiply_array = exp_tile_points["points"] / iter
-    exp_tile_points = util.add_col_np(exp_tile_points, "exp_points", multiply_array)
-    return prob_first, prob_second, prob_other, exp_tile_points
+    return turn_prob_info(game, iter, exact, workers, seed, precision, dice)[0]
+
 
+def turn_prob_info(
+    game, iter, exact=False, workers=None, seed=None, precision=None, dice=None
+):
+    """Turn probability arrays with the simulations behind them
 
-def game_prob_numpy(game, iter):
+    Parameters are the same as `turn_prob_numpy`.
+
+    Returns
+    -------
+    tuple
+        Probabilities as returned by `turn_prob_numpy`
+    dict
+        Dictionary with the simulations run (`iter`), None when `exact`, and the
+        widest 95% confidence interval half-width of the first and second place
+        probabilities (`error`)
+    """
+    if exact:
+        result, tile_points_result = game.turn_exact(game.camel_dict, game.tiles_dict)
+        prob_first = create_exact_prob_array(result[result["place"] == 1])
+        prob_second = create_exact_prob_array(result[result["place"] == 2])
+        prob_other = create_exact_prob_array(result[result["place"] > 2])
+        exp_tile_points = util.add_col_np(
+            tile_points_result, "exp_points", tile_points_result["points"]
+        )
+        turn_probs = prob_first, prob_second, prob_other, exp_tile_points
+        return turn_probs, {"iter": None, "error": 0.0}
+    counts = game.monte_counts(
+        "turn",
+        game.camel_dict,
+        game.tiles_dict,
+        iter,
+        workers,
+        seed,
+        precision=precision,
+        dice=dice,
+    )
+    info = {"iter": counts.n, "error": counts.half_width([[1], [2]])}
+    return turn_probs_from_counts(counts), info
+
+
+def game_prob_numpy(
+    game,
+    iter,
+    vectorized=False,
+    workers=None,
+    seed=None,
+    precision=None,
+    dice=None,
+    stratified=False,
+    markov_chain=False,
+    tol=0.0,
+):
     """Create game probability arrays
 
     Parameters
@@ -377,19 +1500,137 @@ def game_prob_numpy(game, iter):
     game : camel up game
         Camel up game class
     iter : int
-        Number of simulation iterations
+        Number of simulation iterations, the cap when `precision` is given
+    vectorized : bool
+        Simulate the games together with the vectorized engine
+    workers : int
+        Number of processes for the monte carlo, None runs it in this process
+    seed : int
+        Seed of the monte carlo, None for fresh entropy
+    precision : float
+        Target 95% confidence interval half-width of the first and last place
+        probabilities, see `Game.monte_counts`
+    dice : DiceBlock
+        Common dice for the monte carlo, None for an independent run
+    stratified : bool
+        Enumerate the current leg and only simulate the later legs, see
+        `Game.game_stratified`, always runs all of `iter` in this process and
+        ignores `dice`
+    markov_chain : bool
+        Enumerate the current leg and solve the later legs exactly with
+        `markov.game_counts` instead of simulating them
+    tol : float
+        Truncation tolerance of `markov.solve`, only used with `markov_chain`
 
     Returns
     -------
-    array
-        Numpy array
+    tuple
+        First and last place probabilities
+
+    """
+    return game_prob_info(
+        game,
+        iter,
+        vectorized,
+        workers,
+        seed,
+        precision,
+        dice,
+        stratified,
+        markov_chain,
+        tol,
+    )[0]
+
+
+def game_prob_info(
+    game,
+    iter,
+    vectorized=False,
+    workers=None,
+    seed=None,
+    precision=None,
+    dice=None,
+    stratified=False,
+    markov_chain=False,
+    tol=0.0,
+):
+    """Game probability arrays with the simulations behind them
+
+    Parameters are the same as `game_prob_numpy`.
+
+    Returns
+    -------
+    tuple
+        Probabilities as returned by `game_prob_numpy`
+    dict
+        Dictionary with the simulations run (`iter`) and the widest 95%
+        confidence interval half-width of the first and last place probabilities
+        (`error`), `tol` with `markov_chain`
+    """
+    if markov_chain:
+        counts = markov.game_counts(
+            game, game.camel_dict, game.tiles_dict, iter, tol=tol
+        )
+    elif stratified:
+        counts = game.game_stratified(
+            game.camel_dict, game.tiles_dict, iter, rng=np.random.default_rng(seed)
+        )
+    else:
+        counts = game.monte_counts(
+            "game",
+            game.camel_dict,
+            game.tiles_dict,
+            iter,
+            workers,
+            seed,
+            vectorized,
+            precision=precision,
+            dice=dice,
+        )
+    if markov_chain:
+        info = {"iter": counts.n, "error": tol}
+    else:
+        num_camels = len(counts.camels)
+        info = {"iter": counts.n, "error": counts.half_width([[1], [num_camels]])}
+    return game_probs_from_counts(counts), info
+
+
+def turn_probs_from_counts(counts):
+    """Turn probability arrays from the counts of the leg monte carlo
 
+    Parameters
+    ----------
+    counts : RaceCounts
+        Counts of the leg simulations
+
+    Returns
+    -------
+    tuple
+        First, second and other place probabilities and expected tile points
+    """
+    num_camels = len(counts.camels)
+    return (
+        counts.prob_array([1]),
+        counts.prob_array([2]),
+        counts.prob_array(range(3, num_camels + 1)),
+        counts.tile_points_array(),
+    )
+
+
+def game_probs_from_counts(counts):
+    """Game probability arrays from the counts of the game monte carlo
+
+    Parameters
+    ----------
+    counts : RaceCounts
+        Counts of the game simulations
+
+    Returns
+    -------
+    tuple
+        First and last place probabilities
     """
-    result = game.game_monte(game.camel_dict, game.tiles_dict, iter=iter)
-    loser_place = max(result["place"])
-    prob_first = create_prob_array(result[result["place"] == 1], iter)
-    prob_last = create_prob_array(result[result["place"] == loser_place], iter)
-    return prob_first, prob_last
+    return counts.prob_array([1]), counts.prob_array([len(counts.camels)])
 
 
 def winner_loser_bets_to_numpy(game):
@@ -6,8 +6,6 @@ from io import StringIO
 
 import numpy as np
 
-from numpy.lib.recfunctions import append_fields
-
 
 def parse_dump(string):
     """Gets information from the AST dump and return the AST object and the id
@@ -70,10 +68,10 @@ def add_col_np(df, target_col, array):
     ----------
     df : array
         Numpy array
-    target_col : str
-        Column to create
-    array : array
-        Array to add as column
+    target_col : str or list
+        Column to create, or columns to create together
+    array : array or list
+        Array to add as column, or one array per column in `target_col`
 
     Returns
     -------
@@ -81,8 +79,16 @@ def add_col_np(df, target_col, array):
         Numpy array
 
     """
-    df = append_fields(df, target_col, array, "<f8", usemask=False)
-    return df
+    if isinstance(target_col, str):
+        target_col, array = [target_col], [array]
+    new_df = np.empty(
+        df.shape, dtype=_fields(df) + [(col, "<f8") for col in target_col]
+    )
+    for col in df.dtype.names:
+        new_df[col] = df[col]
+    for col, values in zip(target_col, array):
+        new_df[col] = values
+    return new_df
 
 
 def benchmark(func, iteration, *args, **kwargs):
@@ -175,16 +181,25 @@ def numpy_group_by_sum(array, index, sum_col):
         Numpy array
 
     """
-    unique_groups = np.unique(array[index])
-    sums = []
-    for group in unique_groups:
-        sums.append((group, array[array[index] == group][sum_col].sum()))
-    return np.array(sums, dtype=[(f"{index}", float), (f"{sum_col}", float)])
+    unique_groups, groups = np.unique(array[index], return_inverse=True)
+    sums = np.bincount(
+        groups.ravel(), weights=array[sum_col], minlength=unique_groups.shape[0]
+    )
+    result = np.empty(
+        unique_groups.shape, dtype=[(f"{index}", float), (f"{sum_col}", float)]
+    )
+    result[index] = unique_groups
+    result[sum_col] = sums
+    return result
 
 
 def numpy_left_join(df1, df2, key):
     """Basic left join, return left join of 2 dataframe, duplicates allowing in df1. Only one key allowed
 
+    The columns of `df1` come first, then the other columns of `df2` in order. Rows
+    of `df1` without a match get zeros in the columns of `df2`, and when `df2` has
+    the key more than once its last row is used.
+
     Parameters
     ----------
     df1 : array
@@ -200,17 +215,22 @@ def numpy_left_join(df1, df2, key):
         Numpy array
 
     """
-    df2_descr = list(filter(lambda x: x[0] != key, df2.dtype.descr))
-    new_df_dtype = np.dtype(list(set(df1.dtype.descr + df2_descr)))
-    new_df = np.zeros(df1.shape, dtype=new_df_dtype)
+    df2_fields = [
+        (col, dtype) for col, dtype in _fields(df2) if col not in df1.dtype.names
+    ]
+    new_df = np.zeros(df1.shape, dtype=_fields(df1) + df2_fields)
     for col in df1.dtype.names:
         new_df[col] = df1[col]
-    for new_row in new_df:
-        for row in df2:
-            if row[key] == new_row[key]:
-                for col in df2.dtype.names:
-                    new_row[col] = row[col]
-                next
+    order = np.argsort(df2[key], kind="stable")
+    right = df2[key][order]
+    left = df1[key]
+    found = np.searchsorted(right, left, side="right") - 1
+    matched = found >= 0
+    matched[matched] = right[found[matched]] == left[matched]
+    rows = order[found[matched]]
+    for col in df2.dtype.names:
+        if col != key:
+            new_df[col][matched] = df2[col][rows]
     return new_df
 
 
@@ -261,3 +281,10 @@ def return_max_value(lst, index):
     flatten = list(map(lambda x: x[index], lst))
     max_index = flatten.index(max(flatten))
     return lst[max_index]
+
+
+def _fields(df):
+    """
+    Names and dtypes of the columns of a numpy array, without padding
+    """
+    return [(col, df.dtype.fields[col][0]) for col in df.dtype.names]
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+
+"""Module with position hashing and the transposition table
+
+A position is hashed as the XOR of a 64 bit key for each of its features, the
+space and height of every camel, whether it still needs to roll and every tile
+on the board. Keys come from a hash of the feature itself rather than a random
+table, so they are the same in every process and session. The game keeps the
+hash up to date as moves are played by XORing out the features that change and
+XORing in their replacements.
+"""
+
+import logging
+
+from collections import OrderedDict
+from hashlib import blake2b
+
+
+logger = logging.getLogger(__name__)
+
+KEYS = dict()
+
+
+def feature_key(*feature):
+    """64 bit key of a feature
+
+    Parameters
+    ----------
+    feature : tuple
+        Values describing the feature, e.g. ``("camel", "red", 3, 1)``
+
+    Returns
+    -------
+    int
+        Key of the feature
+    """
+    key = KEYS.get(feature)
+    if key is None:
+        digest = blake2b(repr(feature).encode(), digest_size=8).digest()
+        key = KEYS[feature] = int.from_bytes(digest, "little")
+    return key
+
+
+def camel_key(camel, val):
+    """Key of a camel's position and roll flag
+
+    Parameters
+    ----------
+    camel : str
+        Name of the camel
+    val : dict
+        Camel entry of the camel dictionary
+
+    Returns
+    -------
+    int
+        Key of the camel
+    """
+    key = feature_key("camel", camel, val["space"], val["height"])
+    if val["need_roll"]:
+        key ^= feature_key("roll", camel)
+    return key
+
+
+def tile_key(space, tile):
+    """Key of a tile on the board
+
+    Parameters
+    ----------
+    space : int
+        Space of the tile
+    tile : dict
+        Tile entry of the tiles dictionary
+
+    Returns
+    -------
+    int
+        Key of the tile
+    """
+    return feature_key("tile", space, tile["tile_type"], tile["player"])
+
+
+def position_hash(camel_dict, tiles_dict):
+    """Hash of the camels and tiles from scratch
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+
+    Returns
+    -------
+    int
+        Hash of the position
+    """
+    key = 0
+    for camel, val in camel_dict.items():
+        key ^= camel_key(camel, val)
+    for space, tile in tiles_dict.items():
+        key ^= tile_key(space, tile)
+    return key
+
+
+def canonical_camels(camel_dict):
+    """Camels ordered by space and height, the labelling of `canonical_hash`
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+
+    Returns
+    -------
+    list
+        Names of the camels from the back of the race to the front
+    """
+    return sorted(
+        camel_dict,
+        key=lambda camel: (camel_dict[camel]["space"], camel_dict[camel]["height"]),
+    )
+
+
+def canonical_hash(camel_dict, tiles_dict):
+    """Hash of the camels and tiles up to the colours of the camels
+
+    The camels are labelled by their index in `canonical_camels` instead of their
+    name, so positions that only differ by a permutation of the colours, which race
+    the same way, share a hash.
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+
+    Returns
+    -------
+    int
+        Hash of the position
+    list
+        Names of the camels in canonical order
+    """
+    camels = canonical_camels(camel_dict)
+    key = 0
+    for index, camel in enumerate(camels):
+        key ^= camel_key(index, camel_dict[camel])
+    for space, tile in tiles_dict.items():
+        key ^= tile_key(space, tile)
+    return key, camels
+
+
+def leg_hash(camel_dict, tiles_dict, reach):
+    """Hash of the camels and reachable tiles relative to the rearmost camel
+
+    Camels are labelled as in `canonical_hash` and their spaces, like the spaces of
+    the tiles, are counted from the rearmost camel. Tiles on or behind it, or past
+    `reach`, can't be landed on this leg and are left out, so the same leg at
+    another point of the track shares a hash. Only valid for the leg if no camel
+    can reach the finish.
+
+    Parameters
+    ----------
+    camel_dict : nested dict
+        Dictionary with current camel positions
+    tiles_dict : dict
+        Dictonary with tiles information
+    reach : int
+        Furthest space a camel can land on this leg, see `gameplay.leg_reach`
+
+    Returns
+    -------
+    int
+        Hash of the leg
+    list
+        Names of the camels in canonical order
+    """
+    camels = canonical_camels(camel_dict)
+    rear = camel_dict[camels[0]]["space"]
+    key = 0
+    for index, camel in enumerate(camels):
+        val = camel_dict[camel]
+        key ^= feature_key("leg", index, val["space"] - rear, val["height"])
+        if val["need_roll"]:
+            key ^= feature_key("roll", index)
+    for space, tile in tiles_dict.items():
+        if rear < space <= reach:
+            key ^= feature_key(
+                "leg_tile", space - rear, tile["tile_type"], tile["player"]
+            )
+    return key, camels
+
+
+class TranspositionTable:
+    """Least recently used cache of evaluated positions with a byte budget
+
+    Parameters
+    ----------
+    max_bytes : int
+        Budget for the sizes given to `put`, least recently used entries are
+        evicted once it is exceeded
+
+    Attributes
+    ----------
+    hits : int
+        Lookups that found their position
+    misses : int
+        Lookups that didn't
+    evictions : int
+        Entries dropped to stay within the budget
+    nbytes : int
+        Size of the entries held
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Looks up a position
+
+        Parameters
+        ----------
+        key : int
+            Hash of the position
+
+        Returns
+        -------
+        object
+            Stored value, None on a miss
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size):
+        """Stores a position, evicting the least recently used ones to fit
+
+        Parameters
+        ----------
+        key : int
+            Hash of the position
+        value : object
+            Value to store
+        size : int
+            Bytes charged to the budget for the value
+        """
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            self.nbytes -= self.entries.popitem(last=False)[1][1]
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every entry, the counters are kept
+        """
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """Counters of the table
+
+        Returns
+        -------
+        dict
+            Entries, bytes, hits, misses and evictions
+        """
+        return {
+            "entries": len(self.entries),
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SharedTable:
+    """Transposition table shared by the processes of a parallel search
+
+    Positions are looked up in a local `TranspositionTable` first and then in a
+    dictionary shared through a `multiprocessing.Manager`, every position stored
+    goes to both so other processes don't evaluate it again.
+
+    Parameters
+    ----------
+    shared : dict
+        Dictionary proxy shared between the processes
+    local : TranspositionTable
+        Table of the process, e.g. the one inherited from the parent
+    """
+
+    def __init__(self, shared, local):
+        self.shared = shared
+        self.local = local
+
+    def __len__(self):
+        return len(self.shared)
+
+    def __contains__(self, key):
+        return key in self.local or key in self.shared
+
+    def get(self, key):
+        """Looks up a position locally, then in the shared dictionary
+
+        Parameters
+        ----------
+        key : int
+            Hash of the position
+
+        Returns
+        -------
+        object
+            Stored value, None on a miss
+        """
+        value = self.local.get(key)
+        if value is None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self.local.put(key, *entry)
+                value = entry[0]
+        return value
+
+    def put(self, key, value, size):
+        """Stores a position locally and in the shared dictionary
+
+        Parameters
+        ----------
+        key : int
+            Hash of the position
+        value : object
+            Value to store
+        size : int
+            Bytes charged to the local budget for the value
+        """
+        self.local.put(key, value, size)
+        self.shared[key] = (value, size)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `benchmarks` module."""
+
+import numpy as np
+import pytest
+
+import camelup.benchmarks as benchmarks
+import camelup.config as config
+
+
+def test_random_tables():
+    bets, probs = benchmarks.random_tables(100, np.random.default_rng(0))
+    assert bets.shape == (100,)
+    assert set(bets["camel"]) <= set(config.CAMELS)
+    assert probs["prob"].sum() == pytest.approx(1)
+
+
+def test_run():
+    results = benchmarks.run(rows=[10, 100], seed=0)
+    assert list(results) == [10, 100]
+    assert set(results[10]) == {"numpy_left_join", "numpy_group_by_sum", "add_col_np"}
+
+
+def test_time_copies():
+    timings = benchmarks.time_copies(number=10)
+    assert set(timings) == {"deepcopy", "copy", "copy_packed", "unpack"}
+    assert timings["copy_packed"] < timings["deepcopy"]
+
+
+def test_time_search():
+    timings = benchmarks.time_search(workers=[None, 1], MAX_DEPTH=1, iter=20)
+    assert list(timings) == [None, 1]
@@ -5,10 +5,13 @@
 
 from copy import deepcopy
 
+import numpy as np
 import pytest
 
 import camelup.camelup as camelup
 
+from camelup.dice import BufferedRandom, DiceBlock
+
 
 camel_dict = {
     "red": {"height": 1, "space": 1, "need_roll": True},
@@ -86,6 +89,27 @@ def test_available_moves(game):
     assert len(game.available_moves()) == 44
 
 
+def test_available_moves_labels(game):
+    moves = game.available_moves()
+    assert moves["Roll"] == camelup.Move("roll")
+    assert moves["Bet Round Winner red - 5 Points"] == camelup.Move("bet_tile", "red")
+    assert moves["Place Skip Tile At 4"] == camelup.Move(
+        "tile", space=4, tile_type="skip"
+    )
+    pruned = game.available_moves_pruned()
+    assert set(pruned) <= set(moves)
+    assert [*pruned.values()] == game.legal_moves(pruned=True)
+
+
+def test_move_array(game):
+    moves = game.move_array()
+    assert len(moves) == 44
+    assert moves[0]["kind"] == camelup.MOVE_KINDS.index("roll")
+    tiles = moves[moves["kind"] == camelup.MOVE_KINDS.index("tile")]
+    assert set(tiles["space"]) == set(range(3, 17))
+    assert (moves[moves["kind"] == 0]["camel"] == -1).all()
+
+
 def test_available_tile_placements(game):
     assert game.available_tile_placements() == list(range(3, 17))
     game.play_tile("block", 3)
@@ -106,6 +130,17 @@ def test_play(game):
     assert list(game.tiles_dict.keys()) == [5, 7, 9]
 
 
+def test_play_move(game):
+    game.state = 1
+    game.play(camelup.Move("tile", space=5, tile_type="skip"))
+    game.play(camelup.Move("bet_tile", "red"))
+    game.play(camelup.Move("roll", "green", roll=1))
+    assert game.state == 1
+    assert game.tiles_dict[5] == {"tile_type": "skip", "player": 1}
+    assert game.player_dict[2]["bet_tiles"] == {"red": [5]}
+    assert game.camel_dict["green"]["space"] == 3
+
+
 def test_play_tile(game):
     game.play_tile("block", 5)
     assert game.tiles_dict == {5: {"tile_type": "block", "player": 1}}
@@ -143,3 +178,259 @@ def test_play_roll(game):
 
 def test_winner(game):
     assert game._winner(camel_dict) == {"green": 1, "blue": 2, "red": 3}
+
+
+def test_turn_exact(game):
+    game.camel_dict["red"]["need_roll"] = False
+    game.camel_dict["blue"]["need_roll"] = False
+    result, tile_points = game.turn_exact(game.camel_dict, game.tiles_dict)
+    assert sorted(result[result["camel"] == "green"]["place"]) == [1]
+    assert result[result["camel"] == "green"]["prob"][0] == pytest.approx(1)
+    assert result[result["place"] == 2]["prob"].sum() == pytest.approx(1)
+    assert tile_points.shape == (0,)
+
+
+def test_turn_exact_tile_points(game):
+    game.camel_dict["red"]["need_roll"] = False
+    game.camel_dict["blue"]["need_roll"] = False
+    game.play_tile("skip", 4)
+    result, tile_points = game.turn_exact(game.camel_dict, game.tiles_dict)
+    assert list(tile_points["player"]) == [1]
+    assert tile_points["points"][0] == pytest.approx(1 / 3)
+
+
+def test_leg_outcomes(game):
+    outcomes = game.leg_outcomes(game.camel_dict, game.tiles_dict)
+    assert sum(prob for _, prob, _ in outcomes) == pytest.approx(1)
+    assert all(
+        not val["need_roll"] for sim_dict, _, _ in outcomes for val in sim_dict.values()
+    )
+
+
+def test_turn_exact_matches_monte(game):
+    game.play_tile("skip", 4)
+    exact, exact_points = game.turn_exact(game.camel_dict, game.tiles_dict)
+    monte, monte_points = game.turn_monte(
+        game.camel_dict, game.tiles_dict, iter=4000, seed=11
+    )
+    for camel, place, prob in exact:
+        rows = monte[monte["camel"] == camel]
+        assert np.mean(rows["place"] == place) == pytest.approx(prob, abs=0.03)
+    assert monte_points["points"].sum() / 4000 == pytest.approx(
+        exact_points["points"].sum(), abs=0.05
+    )
+
+
+def test_leg_outcomes_finished_keep_need_roll(game):
+    game.camel_dict["green"]["space"] = 15
+    outcomes = game.leg_outcomes(game.camel_dict, game.tiles_dict)
+    finished = [
+        sim_dict
+        for sim_dict, _, _ in outcomes
+        if any(val["space"] > 16 for val in sim_dict.values())
+    ]
+    assert finished
+    assert any(val["need_roll"] for sim_dict in finished for val in sim_dict.values())
+    for sim_dict in finished:
+        front = max(sim_dict, key=lambda key: sim_dict[key]["space"])
+        assert not sim_dict[front]["need_roll"]
+    assert sum(prob for _, prob, _ in outcomes) == pytest.approx(1)
+
+
+def test_turn_monte_seeded_workers(game):
+    game.play_tile("skip", 4)
+    serial = game.turn_monte(game.camel_dict, game.tiles_dict, iter=120, seed=7)
+    pooled = game.turn_monte(
+        game.camel_dict, game.tiles_dict, iter=120, workers=2, seed=7
+    )
+    assert np.array_equal(serial[0], pooled[0])
+    assert np.array_equal(serial[1], pooled[1])
+    assert len(serial[0]) == 120 * len(game.camel_dict)
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_game_monte_seeded_workers(game, vectorized):
+    kwargs = dict(iter=120, vectorized=vectorized, seed=3)
+    serial = game.game_monte(game.camel_dict, game.tiles_dict, **kwargs)
+    pooled = game.game_monte(game.camel_dict, game.tiles_dict, workers=2, **kwargs)
+    assert np.array_equal(serial, pooled)
+    assert (serial["place"] == 1).sum() == 120
+
+
+def test_monte_counts_precision(game):
+    game.camel_dict["red"]["need_roll"] = False
+    game.camel_dict["blue"]["need_roll"] = False
+    counts = game.monte_counts(
+        "turn", game.camel_dict, game.tiles_dict, iter=5000, seed=1, precision=0.05
+    )
+    assert counts.n < 5000
+    assert counts.n % camelup.BATCH_SIZE == 0
+    assert counts.half_width([[1], [2]]) <= 0.05
+    capped = game.monte_counts(
+        "game", game.camel_dict, game.tiles_dict, iter=300, seed=1, precision=1e-6
+    )
+    assert capped.n == 300
+
+
+def test_monte_counts_continue(game):
+    dice = DiceBlock(1)
+    counts = game.monte_counts(
+        "game", game.camel_dict, game.tiles_dict, iter=120, dice=dice
+    )
+    game.monte_counts(
+        "game", game.camel_dict, game.tiles_dict, iter=300, dice=dice, counts=counts
+    )
+    whole = game.monte_counts(
+        "game", game.camel_dict, game.tiles_dict, iter=300, dice=dice
+    )
+    assert counts.n == 300
+    assert (counts.places == whole.places).all()
+
+
+def test_monte_counts_continue_seed(game):
+    counts = game.monte_counts(
+        "turn", game.camel_dict, game.tiles_dict, iter=100, seed=3
+    )
+    assert counts.streams == 100 // camelup.CHUNK_SIZE
+    game.monte_counts(
+        "turn", game.camel_dict, game.tiles_dict, iter=300, seed=3, counts=counts
+    )
+    whole = game.monte_counts(
+        "turn", game.camel_dict, game.tiles_dict, iter=300, seed=3
+    )
+    assert counts.streams == whole.streams
+    assert (counts.places == whole.places).all()
+
+
+def test_game_stratified_finished_leg(game):
+    game.camel_dict["red"]["need_roll"] = False
+    game.camel_dict["blue"]["need_roll"] = False
+    game.camel_dict["green"]["space"] = 16
+    counts = game.game_stratified(game.camel_dict, game.tiles_dict, iter=100)
+    prob = counts.prob_array([1])
+    assert prob[prob["camel"] == "green"]["prob"][0] == pytest.approx(1)
+    assert counts.prob_array([3])["prob"].sum() == pytest.approx(1)
+
+
+def test_game_stratified(game):
+    game.camel_dict["red"]["need_roll"] = False
+    counts = game.game_stratified(
+        game.camel_dict, game.tiles_dict, iter=2000, rng=np.random.default_rng(0)
+    )
+    assert counts.n == 2000
+    assert counts.places.sum(axis=0) == pytest.approx([2000] * 3, rel=0.05)
+    assert counts.places.sum(axis=1) == pytest.approx([2000] * 3, rel=0.05)
+
+
+def test_game_rng():
+    first = camelup.Game(2, rng=BufferedRandom(5))
+    second = camelup.Game(2, rng=BufferedRandom(5))
+    assert first.camel_dict == second.camel_dict
+    assert first.sim_game(first.camel_dict, dict()) == second.sim_game(
+        second.camel_dict, dict()
+    )
+    assert first.copy().rng is first.rng
+
+
+@pytest.mark.parametrize(
+    "move",
+    [
+        camelup.Move("tile", space=5, tile_type="block"),
+        camelup.Move("winner_card", "red"),
+        camelup.Move("loser_card", "blue"),
+        camelup.Move("bet_tile", "green"),
+        camelup.Move("roll", "green", roll=3),
+    ],
+)
+def test_make_unmake(game, move):
+    game.play_bet_tile("red")
+    game.play_tile("skip", 4)
+    before = game.get_state()
+    key = game.position_key
+    output, undo = game.make(move)
+    assert game.get_state() != before
+    game.unmake(undo)
+    assert game.get_state() == before
+    assert game.position_key == key
+
+
+@pytest.mark.parametrize("space", [2, 16])
+def test_make_unmake_end_of_leg(game, space):
+    game.camel_dict["red"]["need_roll"] = False
+    game.camel_dict["blue"]["need_roll"] = False
+    game.camel_dict["green"]["space"] = space
+    game.rehash()
+    game.play_bet_tile("green")
+    before = game.get_state()
+    key = game.position_key
+    output, undo = game.make(camelup.Move("roll", "green", roll=1))
+    if space == 16:
+        assert output == "Done"
+        assert game.player_dict[1]["bet_tiles"] == {"green": [5]}
+    else:
+        assert output is None
+        assert game.player_dict[1]["bet_tiles"] == dict()
+        assert game.bet_tiles["green"] == [5, 3, 2]
+    game.unmake(undo)
+    assert game.get_state() == before
+    assert game.position_key == key
+
+
+def test_make_unmake_last_bet_tile(game):
+    game.play_bet_tile("green")
+    game.play_bet_tile("green")
+    order = [*game.bet_tiles]
+    before = game.get_state()
+    output, undo = game.make(camelup.Move("bet_tile", "green"))
+    assert "green" not in game.bet_tiles
+    game.unmake(undo)
+    assert [*game.bet_tiles] == order
+    assert game.get_state() == before
+
+
+def test_get_state_round_trip(game_param):
+    game_param.play("self.play_bet_tile('red')")
+    game_param.play("self.play_bet_tile('red')")
+    game_param.play("self.play_winner_card('blue')")
+    game_param.play("self.play_tile('skip', 14)")
+    game_param.play_loser_card("green")
+    copied = camelup.Game.from_state(game_param.get_state())
+    for attr in [
+        "camel_dict",
+        "player_dict",
+        "bet_tiles",
+        "tiles_dict",
+        "winner_bets",
+        "loser_bets",
+        "state",
+        "num_players",
+    ]:
+        assert getattr(copied, attr) == getattr(game_param, attr)
+
+
+def test_copy(game):
+    copied = game.copy()
+    copied.play("self.play_bet_tile('red')")
+    copied.play_roll("green", 1)
+    assert game.bet_tiles["red"] == [5, 3, 2]
+    assert game.camel_dict["green"]["space"] == 2
+    assert game.get_state() != copied.get_state()
+    assert hash(game.get_state()) == hash(game.copy().get_state())
+
+
+def test_copy_packed(game):
+    game.rehash()
+    copied = game.copy().copy()
+    assert not any(field in vars(copied) for field in camelup.PACKED_FIELDS)
+    assert copied.get_state() == game.get_state()
+    copied.camel_dict = deepcopy(camel_dict)
+    assert copied.tiles_dict == game.tiles_dict
+    assert copied.position_key == game.position_key
+
+
+def test_state_views(game):
+    state = game.get_state()
+    assert state.camel_dict == game.camel_dict
+    assert state.player_dict == game.player_dict
+    with pytest.raises(TypeError):
+        state.camel_dict["red"] = None
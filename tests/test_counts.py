@@ -0,0 +1,71 @@
+"""Tests for counts"""
+
+import numpy as np
+import pytest
+
+from camelup.counts import RaceCounts
+
+
+camels = ["red", "blue", "green"]
+
+
+@pytest.fixture
+def counts():
+    counts = RaceCounts(camels)
+    counts.add({"red": 1, "blue": 2, "green": 3}, {1: 1})
+    counts.add({"red": 2, "blue": 1, "green": 3})
+    return counts
+
+
+def test_add(counts):
+    assert counts.n == 2
+    assert list(counts.places[0]) == [1, 1, 0]
+    assert counts.tile_points == {1: 1}
+
+
+def test_add_places(counts):
+    counts.add_places(np.array([[1, 2, 3], [3, 2, 1]]), np.array([[0, 1], [0, 2]]))
+    assert counts.n == 4
+    assert list(counts.places[:, 0]) == [2, 1, 1]
+    assert counts.tile_points == {1: 4}
+
+
+def test_merge(counts):
+    other = RaceCounts(["green", "blue", "red"])
+    other.add({"red": 3, "blue": 1, "green": 2}, {2: 1})
+    counts.merge(other)
+    assert counts.n == 3
+    assert list(counts.places[0]) == [1, 1, 1]
+    assert counts.tile_points == {1: 1, 2: 1}
+
+
+def test_snapshot(counts):
+    snapshot = counts.snapshot()
+    counts.add({"red": 1, "blue": 2, "green": 3})
+    assert snapshot.n == 2
+    assert snapshot.places.sum() == 6
+
+
+def test_prob_array(counts):
+    prob = counts.prob_array([1])
+    assert list(prob["camel"]) == camels
+    assert list(prob["prob"]) == [0.5, 0.5, 0]
+    assert list(counts.prob_array([2, 3])["counts"]) == [1, 1, 2]
+
+
+def test_half_width(counts):
+    assert counts.half_width([[1]]) == pytest.approx(1.96 * 0.5 / np.sqrt(2))
+    assert counts.half_width([[3]]) == 0
+    assert RaceCounts(camels).half_width([[1]]) == float("inf")
+
+
+def test_tile_points_array(counts):
+    points = counts.tile_points_array()
+    assert list(points["player"]) == [1]
+    assert points["exp_points"][0] == pytest.approx(0.5)
+
+
+def test_rows(counts):
+    rows = counts.rows()
+    assert len(rows) == 6
+    assert sorted(rows[rows["camel"] == "red"]["place"]) == [1, 2]
@@ -0,0 +1,85 @@
+"""Tests for dice"""
+
+import pickle
+
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+import camelup.camelup as camelup
+import camelup.config as config
+
+from camelup.dice import BufferedRandom, DiceBlock
+
+
+camel_dict = {
+    "red": {"height": 1, "space": 1, "need_roll": True},
+    "blue": {"height": 2, "space": 1, "need_roll": True},
+    "green": {"height": 1, "space": 2, "need_roll": True},
+}
+
+
+def test_buffered_random():
+    rng = BufferedRandom(0, size=8)
+    other = BufferedRandom(0, size=8)
+    rolls = [rng.randint(1, 3) for _ in range(20)]
+    assert set(rolls) <= {1, 2, 3}
+    assert rolls == [other.randint(1, 3) for _ in range(20)]
+    assert rng.choice(["red"]) == "red"
+    assert 0 <= rng.random() < 1
+    assert 4 <= rng.randint(4, 6) <= 6
+    assert sorted(rng.permutation(5)) == [0, 1, 2, 3, 4]
+
+
+def test_stream_repeats():
+    dice = DiceBlock(3)
+    first = dice.stream(5)
+    second = dice.stream(5)
+    picks = [first.choice(["red", "blue", "green"]) for _ in range(3)]
+    assert picks == [second.choice(["red", "blue", "green"]) for _ in range(3)]
+    assert first.randint(1, 3) == second.randint(1, 3)
+
+
+def test_stream_per_camel():
+    stream = DiceBlock(1).stream(0)
+    camel = stream.choice(["red", "blue", "green"])
+    roll = stream.randint(1, 3)
+    rest = [key for key in ["red", "blue", "green"] if key != camel]
+    next_camel = stream.choice(rest)
+    other = DiceBlock(1).stream(0)
+    assert other.choice(rest) == next_camel
+    assert other.randint(1, 3) == stream.randint(1, 3)
+    assert 1 <= roll <= 3
+
+
+def test_stream_new_leg():
+    stream = DiceBlock(2).stream(0)
+    stream.choice(["red"])
+    assert stream.leg == 0
+    stream.choice(["red", "blue", "green"])
+    assert stream.leg == 1
+
+
+def test_block_draw():
+    dice = DiceBlock(5)
+    dice.draw(10)
+    assert dice.ranks.shape[0] == dice.dice.shape[0] >= 10
+    assert (np.sort(dice.ranks, axis=2) == np.arange(len(config.CAMELS))).all()
+    assert set(np.unique(dice.dice)) == {1, 2, 3}
+    assert pickle.loads(pickle.dumps(dice)).stream(7).ranks == dice.ranks[7].tolist()
+    with pytest.raises(AssertionError):
+        dice.stream(0).randint(1, 6)
+
+
+def test_monte_counts_common_dice():
+    game = camelup.Game(2)
+    game.camel_dict = deepcopy(camel_dict)
+    dice = DiceBlock(4)
+    first = game.monte_counts(
+        "game", game.camel_dict, game.tiles_dict, iter=120, workers=2, dice=dice
+    )
+    second = game.monte_counts(
+        "game", game.camel_dict, game.tiles_dict, iter=120, vectorized=True, dice=dice
+    )
+    assert np.array_equal(first.places, second.places)
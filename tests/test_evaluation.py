@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `evaluation` module."""
+
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+import camelup.camelup as camelup
+import camelup.config as config
+import camelup.evaluation as evaluation
+import camelup.treesearch as treesearch
+
+
+camel_dict = {
+    "red": {"height": 1, "space": 1, "need_roll": True},
+    "blue": {"height": 2, "space": 1, "need_roll": True},
+    "green": {"height": 1, "space": 2, "need_roll": True},
+}
+
+
+@pytest.fixture()
+def game():
+    game = camelup.Game(3)
+    game.camel_dict = deepcopy(camel_dict)
+    game.rehash()
+    for move in [
+        camelup.Move("bet_tile", "blue"),
+        camelup.Move("winner_card", "green"),
+        camelup.Move("winner_card", "green"),
+        camelup.Move("loser_card", "red"),
+        camelup.Move("bet_tile", "blue"),
+    ]:
+        game.play(move)
+    return game
+
+
+def probs(game):
+    turn_probs = treesearch.turn_prob_numpy(game, 200)
+    game_probs = treesearch.game_prob_numpy(game, 200)
+    return tuple(turn_probs), tuple(game_probs)
+
+
+def test_encode(game):
+    holdings = evaluation.encode(game)
+    blue = evaluation.CAMEL_IDS["blue"]
+    green = evaluation.CAMEL_IDS["green"]
+    assert holdings.tile_count[:, blue].tolist() == [1, 1, 0]
+    assert holdings.tile_value[0, blue] > holdings.tile_value[1, blue]
+    assert holdings.winner_count[:, green].tolist() == [0, 1, 1]
+    assert holdings.winner_points[:, green].tolist() == [0, *config.BET_SCALING[:2]]
+    assert holdings.loser_count.sum() == 1
+
+
+def test_utilities(game):
+    turn_probs, game_probs = probs(game)
+    dense = treesearch.dense_utility_array(game, turn_probs, game_probs)
+    joined = treesearch.position_utility(game, turn_probs, game_probs)
+    assert dense["utility"] == pytest.approx(joined["utility"])
+
+
+def test_utilities_batch(game):
+    states = []
+    for move in game.legal_moves(pruned=True)[:3]:
+        undo = game.make(move)[1]
+        states.append((evaluation.encode(game), *probs(game)))
+        game.unmake(undo)
+    single = []
+    leaves = []
+    for holdings, turn_probs, game_probs in states:
+        leaf = evaluation.encode_probs(turn_probs, game_probs, game.num_players)
+        single.append(evaluation.utilities(holdings, *leaf))
+        leaves.append(leaf)
+    batch = evaluation.utilities(
+        evaluation.stack([state[0] for state in states]),
+        np.stack([leaf[0] for leaf in leaves]),
+        np.stack([leaf[1] for leaf in leaves]),
+    )
+    assert batch == pytest.approx(np.stack(single))
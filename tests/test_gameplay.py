@@ -117,3 +117,64 @@ def test_move_with_skip(camel_dict_copy):
     assert gameplay.move(camel_dict_copy, tiles_dict, "blue", 1) == 2
     assert camel_dict_copy["blue"]["space"] == 3
     assert camel_dict_copy["blue"]["height"] == 2
+
+
+board_tiles = {
+    5: {"tile_type": "block", "player": 1},
+    2: {"tile_type": "skip", "player": 1},
+}
+
+
+def test_board_init():
+    board = gameplay.Board(camel_dict, board_tiles)
+    assert board.stacks == {1: ["red", "blue"], 3: ["green"], 4: ["yellow", "white"]}
+    assert board.occupied == 0b11010
+    assert board.skips == 0b100
+    assert board.blocks == 0b100000
+
+
+def test_board_move_with_block(camel_dict_copy):
+    board = gameplay.Board(camel_dict_copy, board_tiles)
+    assert board.move("red", 4) == 5
+    assert board.stacks == {3: ["green"], 4: ["red", "blue", "yellow", "white"]}
+    board.update(camel_dict_copy)
+    assert camel_dict_copy["red"]["height"] == 1
+    assert camel_dict_copy["white"]["height"] == 4
+
+
+def test_board_move_with_skip(camel_dict_copy):
+    board = gameplay.Board(camel_dict_copy, board_tiles)
+    assert board.move("blue", 1) == 2
+    assert board.stacks == {1: ["red"], 3: ["green", "blue"], 4: ["yellow", "white"]}
+    assert board.move("green", 3) is None
+    assert board.stacks[6] == ["green", "blue"]
+    assert board.occupied == 0b1010010
+
+
+def test_board_move_same_square(camel_dict_copy):
+    board = gameplay.Board(camel_dict_copy, {5: {"tile_type": "block", "player": 1}})
+    board.move("white", 1)
+    assert board.stacks[4] == ["white", "yellow"]
+
+
+def test_board_copy():
+    board = gameplay.Board(camel_dict, board_tiles)
+    branch = board.copy()
+    branch.move("green", 1)
+    assert board.stacks[3] == ["green"]
+    assert board.spaces["green"] == 3
+
+
+def test_board_tile_placements():
+    board = gameplay.Board(camel_dict, {7: {"tile_type": "skip", "player": 1}})
+    assert board.tile_placements() == [2, 5, 9, 10, 11, 12, 13, 14, 15, 16]
+    assert board.tile_placements(pruned=True) == [2, 5, 9, 10, 11]
+
+
+def test_leg_reach(camel_dict_copy):
+    assert gameplay.leg_reach(camel_dict, {}) == 4 + 3 * 5
+    skip = {7: {"tile_type": "skip", "player": 1}}
+    assert gameplay.leg_reach(camel_dict, skip) == 4 + 4 * 5
+    for val in camel_dict_copy.values():
+        val["need_roll"] = False
+    assert gameplay.leg_reach(camel_dict_copy, skip) == 4
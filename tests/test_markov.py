@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `markov` module."""
+
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+import camelup.camelup as camelup
+import camelup.markov as markov
+import camelup.treesearch as treesearch
+
+from camelup.dice import BufferedRandom
+
+
+camel_dict = {
+    "red": {"height": 1, "space": 12, "need_roll": True},
+    "blue": {"height": 2, "space": 12, "need_roll": True},
+    "green": {"height": 1, "space": 14, "need_roll": False},
+}
+
+
+@pytest.fixture(autouse=True)
+def memo(monkeypatch, tmp_path):
+    memo = {"kernels": dict(), "places": dict()}
+    monkeypatch.setattr(markov, "MEMO", memo)
+    monkeypatch.setattr(markov, "MEMO_PATH", str(tmp_path / "markov.pkl"))
+    monkeypatch.setattr(markov, "MEMO_FILE", None)
+    monkeypatch.setattr(markov.atexit, "register", lambda *args: None)
+    return memo
+
+
+@pytest.fixture()
+def game():
+    game = camelup.Game(2, rng=BufferedRandom(0))
+    game.camel_dict = deepcopy(camel_dict)
+    game.rehash()
+    game.play_tile("block", 15)
+    return game
+
+
+def test_leg_kernel():
+    kernel = markov.leg_kernel((12, 12, 14))
+    assert kernel.probs.sum() + kernel.places[:, 0].sum() == pytest.approx(1)
+    assert kernel.places.sum(axis=0) == pytest.approx(kernel.places[:, 0].sum())
+    assert (np.diff(kernel.states, axis=1) >= 0).all()
+    assert sorted(kernel.perms[0].tolist()) == [0, 1, 2]
+
+
+def test_leg_kernel_shift(memo):
+    kernel = markov.leg_kernel((2, 2, 4))
+    shifted = markov.leg_kernel((5, 5, 7))
+    assert list(memo["kernels"]) == [("rel", (0, 0, 2))]
+    assert (shifted.states == kernel.states + 3).all()
+    assert (shifted.probs == kernel.probs).all()
+    assert not shifted.places.any()
+
+
+def test_leg_kernel_rear_at_start():
+    kernel = markov.leg_kernel((0, 10, 14))
+    assert kernel.places.sum() > 0
+    expected = markov.enumerate_leg((0, 10, 14), markov.FINISH)
+    assert (kernel.places == expected.places).all()
+
+
+def test_solve():
+    places = markov.solve((12, 12, 14))
+    assert places.sum(axis=0) == pytest.approx(np.ones(3))
+    assert places.sum(axis=1) == pytest.approx(np.ones(3))
+    approx = markov.solve((12, 12, 14), tol=1e-3)
+    assert np.abs(approx - places).max() < 1e-2
+
+
+def test_game_counts(game):
+    counts = markov.game_counts(game, game.camel_dict, game.tiles_dict, iter=100)
+    assert counts.n == 100
+    assert counts.places.sum() == pytest.approx(300)
+    stratified = game.game_stratified(
+        game.camel_dict, game.tiles_dict, iter=20000, rng=np.random.default_rng(0)
+    )
+    for place in [1, 3]:
+        prob = counts.prob_array([place])["prob"]
+        assert np.abs(prob - stratified.prob_array([place])["prob"]).max() < 0.02
+
+
+def test_game_prob_numpy(game):
+    game_probs = treesearch.game_prob_numpy(game, 100, markov_chain=True)
+    probs, info = treesearch.game_prob_info(game, 100, markov_chain=True, tol=1e-4)
+    assert info == {"iter": 100, "error": 1e-4}
+    assert len(probs) == len(game_probs)
+    assert game_probs[0]["prob"].sum() == pytest.approx(1)
+
+
+def test_save_load(tmp_path, memo):
+    path = str(tmp_path / "markov.pkl")
+    assert not markov.load(path)
+    places = markov.solve((1, 2, 3))
+    markov.save(path)
+    memo["kernels"].clear()
+    memo["places"].clear()
+    assert markov.load(path)
+    assert (memo["places"][((1, 2, 3), 0.0)] == places).all()
+
+
+def test_open_memo(game, memo, monkeypatch):
+    places = markov.solve((1, 2, 3))
+    markov.save()
+    memo["places"].clear()
+    registered = []
+    monkeypatch.setattr(
+        markov.atexit, "register", lambda *args: registered.append(args)
+    )
+    markov.game_counts(game, game.camel_dict, game.tiles_dict, iter=10)
+    markov.game_counts(game, game.camel_dict, game.tiles_dict, iter=10)
+    assert (memo["places"][((1, 2, 3), 0.0)] == places).all()
+    assert registered == [(markov.save, markov.MEMO_PATH)]
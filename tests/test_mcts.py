@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `mcts` module."""
+
+import pytest
+
+import camelup.camelup as camelup
+import camelup.mcts as mcts
+
+from camelup.dice import BufferedRandom
+
+
+@pytest.fixture()
+def game():
+    return camelup.Game(3, rng=BufferedRandom(1))
+
+
+def test_get_move(game):
+    state = game.get_state()
+    results = mcts.get_move(game, 200)
+    assert set(results) == set(game.legal_moves(pruned=True))
+    assert all(value >= 0 for value in results.values())
+    assert game.get_state() == state
+
+
+def test_get_move_budget(game):
+    results, depth = mcts.get_move(game, budget_ms=0)
+    assert len(results) == 1
+    assert depth == 1
+
+
+def test_get_move_seeded():
+    first = mcts.get_move(camelup.Game(3, rng=BufferedRandom(2)), 100)
+    second = mcts.get_move(camelup.Game(3, rng=BufferedRandom(2)), 100)
+    assert first == second
+
+
+def test_simulate(game):
+    root = mcts.Node(game.num_players)
+    for _ in range(50):
+        game_copy = game.copy()
+        assert mcts.simulate(game_copy, root) >= 1
+    assert root.visits == 50
+    assert sum(child.visits for child in root.children.values()) == 50
+
+
+def test_playout(game):
+    coins = mcts.playout(game)
+    assert len(coins) == 3
+    assert max(val["space"] for val in game.camel_dict.values()) > 16
@@ -0,0 +1,96 @@
+"""Tests for simulation"""
+
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+import camelup.simulation as simulation
+
+
+camel_dict = {
+    "red": {"height": 1, "space": 1, "need_roll": True},
+    "blue": {"height": 2, "space": 1, "need_roll": True},
+    "green": {"height": 1, "space": 3, "need_roll": True},
+    "yellow": {"height": 1, "space": 4, "need_roll": True},
+    "white": {"height": 2, "space": 4, "need_roll": True},
+}
+
+tiles_dict = {
+    5: {"tile_type": "block", "player": 1},
+    2: {"tile_type": "skip", "player": 2},
+}
+
+
+@pytest.fixture
+def camel_dict_copy():
+    return deepcopy(camel_dict)
+
+
+def batch(camel_dict, iter):
+    camels = [*camel_dict.keys()]
+    space, height, need_roll = simulation.camels_to_arrays(camel_dict, camels)
+    return (
+        np.tile(space, (iter, 1)),
+        np.tile(height, (iter, 1)),
+        np.tile(need_roll, (iter, 1)),
+    )
+
+
+def test_tiles_to_arrays():
+    tile_type, tile_player = simulation.tiles_to_arrays(tiles_dict)
+    assert tile_type[5] == simulation.BLOCK
+    assert tile_type[2] == simulation.SKIP
+    assert tile_player[2] == 2
+    assert tile_type.sum() == simulation.BLOCK + simulation.SKIP
+
+
+def test_places():
+    space, height, _ = batch(camel_dict, 1)
+    assert list(simulation.places(space, height)[0]) == [5, 4, 3, 2, 1]
+
+
+def test_leg_order():
+    order, dice = simulation.leg_order(1000, 3, np.random.default_rng(0))
+    assert (np.sort(order, axis=1) == np.arange(3)).all()
+    assert len({tuple(row) for row in order}) == 6
+    assert set(np.unique(dice)) == {1, 2, 3}
+
+
+def test_simulate_single_roll(camel_dict_copy):
+    for camel in ["red", "blue", "yellow", "white"]:
+        camel_dict_copy[camel]["need_roll"] = False
+    space, height, need_roll = batch(camel_dict_copy, 300)
+    tile_type, tile_player = simulation.tiles_to_arrays(tiles_dict)
+    finished, tile_points = simulation.simulate(
+        space, height, need_roll, tile_type, tile_player, np.random.default_rng(0), 1
+    )
+    assert not finished.any()
+    assert not need_roll.any()
+    assert set(space[:, 2]) == {4, 6}
+    assert set(height[space[:, 2] == 4, 2]) == {1, 3}
+    under = (space[:, 2] == 4) & (height[:, 2] == 1)
+    assert tile_points[:, 1].sum() == under.sum()
+    assert (height[under, 3:] == [2, 3]).all()
+    assert (space[:, [0, 1, 3, 4]] == [1, 1, 4, 4]).all()
+
+
+def test_game_monte():
+    result = simulation.game_monte(camel_dict, dict(), 200, np.random.default_rng(0))
+    assert result.shape == (1000,)
+    assert (np.bincount(result["place"].astype(int))[1:] == 200).all()
+
+
+def test_board_counts(camel_dict_copy):
+    for camel in ["red", "blue", "yellow", "white"]:
+        camel_dict_copy[camel]["need_roll"] = False
+    boards = [(camel_dict_copy, tiles_dict), (camel_dict_copy, dict())]
+    with_tiles, without_tiles = simulation.board_counts(
+        boards, [*camel_dict], 300, np.random.default_rng(0), max_legs=1
+    )
+    assert with_tiles.n == without_tiles.n == 300
+    assert with_tiles.tile_points[1] > 0
+    assert not without_tiles.tile_points
+    green = with_tiles.index["green"]
+    assert with_tiles.places[green, 0] == 300 - with_tiles.tile_points[1]
+    assert without_tiles.places[green, 0] == 300
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `treesearch` module."""
+
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+import camelup.camelup as camelup
+import camelup.treesearch as treesearch
+import camelup.zobrist as zobrist
+
+from camelup.dice import DiceBlock
+from camelup.zobrist import SharedTable
+
+
+camel_dict = {
+    "red": {"height": 1, "space": 1, "need_roll": True},
+    "blue": {"height": 2, "space": 1, "need_roll": True},
+    "green": {"height": 1, "space": 2, "need_roll": True},
+}
+
+
+@pytest.fixture()
+def game():
+    game = camelup.Game(3)
+    game.camel_dict = deepcopy(camel_dict)
+    game.rehash()
+    return game
+
+
+def key(game):
+    return treesearch.cache_key(
+        game.position_key, game.camel_dict, game.tiles_dict, "game"
+    )[0]
+
+
+@pytest.fixture()
+def leaves(monkeypatch):
+    """Replaces the leaf search with a fixed utility and counts the calls"""
+    calls = []
+
+    def max_value(game, depth, MAX_DEPTH, dice=None, deadline=None):
+        calls.append(depth)
+        return [1.0, 2.0, 3.0]
+
+    monkeypatch.setattr(treesearch, "max_value", max_value)
+    return calls
+
+
+@pytest.fixture()
+def utilities(monkeypatch):
+    """Replaces the leaf utility with the coins and counts the calls"""
+    calls = []
+
+    def calc_utility_np(game, iter, exact=False, precision=None, dice=None):
+        calls.append(game.position_key)
+        coins = [val["coins"] for val in game.player_dict.values()]
+        return np.array(coins, dtype=[("utility", float)])
+
+    monkeypatch.setattr(treesearch, "calc_utility_np", calc_utility_np)
+    return calls
+
+
+def test_get_move_budget(game, utilities):
+    results, depth = treesearch.get_move(game, MAX_DEPTH=2, budget_ms=60000)
+    expected = treesearch.get_move(game, MAX_DEPTH=2)
+    assert depth == 2
+    assert results.keys() == expected.keys()
+    assert max(results.values()) == max(expected.values())
+
+
+def test_get_move_out_of_time(game, utilities):
+    results, depth = treesearch.get_move(game, MAX_DEPTH=2, budget_ms=0)
+    assert depth == 0
+    assert len(results) == 1
+
+
+def test_utility_bound(game):
+    assert treesearch.utility_bound(game, 1, 0) == 5 + 1
+    game.tiles_dict[5] = {"tile_type": "block", "player": 1}
+    game.player_dict[1]["bet_tiles"]["red"] = [5]
+    game.winner_bets.append((1, "red"))
+    assert treesearch.utility_bound(game, 1, 0) == 5 + 1 + 5 + 3 + 8
+    assert treesearch.utility_bound(game, 1, 3) == 5 + 1 + 5 + 6 + 16
+
+
+def test_exp_value(game, leaves):
+    assert treesearch.exp_value(game, 1, 1) == pytest.approx([1.0, 2.0, 3.0])
+    assert len(leaves) == 9
+
+
+def test_exp_value_cutoff(game, leaves):
+    result = treesearch.exp_value(game, 1, 1, alpha=4.5, player=1)
+    assert len(leaves) == 3
+    assert result[0] == pytest.approx((3 + 6 * 6) / 9)
+    assert result[0] < 4.5
+
+
+def test_exp_value_no_cutoff(game, leaves):
+    result = treesearch.exp_value(game, 1, 1, alpha=1.5, player=1)
+    assert len(leaves) == 9
+    assert result == pytest.approx([1.0, 2.0, 3.0])
+
+
+def test_get_move_workers(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "iter", 50)
+    monkeypatch.setattr(treesearch, "prune", False)
+    dice = DiceBlock(1)
+    expected = treesearch.get_move(game, dice=dice)
+    treesearch.CACHE.clear()
+    results = treesearch.get_move(game, dice=dice, workers=2)
+    assert results == pytest.approx(expected)
+    assert key(game) in treesearch.CACHE
+
+
+def test_get_move_workers_one_pool(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "iter", 20)
+    pools = []
+    start_pool = treesearch.start_pool
+
+    def counted_pool(workers):
+        pools.append(start_pool(workers))
+        return pools[-1]
+
+    monkeypatch.setattr(treesearch, "start_pool", counted_pool)
+    _, depth = treesearch.get_move(game, MAX_DEPTH=2, budget_ms=60000, workers=2)
+    assert depth == 2
+    assert len(pools) == 1
+
+
+def test_init_worker(monkeypatch):
+    settings = {name: getattr(treesearch, name) for name in treesearch.SETTINGS}
+    settings["iter"] = 7
+    for name in [*settings, "CACHE"]:
+        monkeypatch.setattr(treesearch, name, getattr(treesearch, name))
+    treesearch._init_worker(settings, dict())
+    assert {name: getattr(treesearch, name) for name in settings} == settings
+    assert isinstance(treesearch.CACHE, SharedTable)
+
+
+def test_halving_values(game):
+    moves = game.legal_moves(pruned=True)
+    results, info = treesearch.halving_values(game, 64, dice=DiceBlock(1))
+    assert set(results) == set(moves)
+    kept = [move for move in moves if info[move]["round"] is None]
+    assert len(kept) == 1
+    assert kept[0] == max(results, key=results.get)
+    assert info[kept[0]]["iter"] == 64
+    assert all(0 <= val["error"] < 1 for val in info.values())
+    assert min(val["iter"] for val in info.values()) < 64
+
+
+def test_get_move_halving(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "halving", True)
+    monkeypatch.setattr(treesearch, "iter", 16)
+    info = dict()
+    results = treesearch.get_move(game, info=info)
+    assert set(info) == set(results)
+    assert max(val["iter"] for val in info.values()) == 16
+
+
+def test_get_move_dense_utility(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "CACHE", treesearch.TranspositionTable(2 ** 24))
+    monkeypatch.setattr(treesearch, "iter", 50)
+    monkeypatch.setattr(treesearch, "prune", False)
+    expected = treesearch.get_move(game)
+    monkeypatch.setattr(treesearch, "dense_utility", True)
+    assert treesearch.get_move(game) == pytest.approx(expected)
+
+
+def test_frontier(game):
+    moves = game.legal_moves(pruned=True)
+    leaves = treesearch.frontier(game, moves, 1)
+    assert game.position_key in leaves
+    assert len(leaves) == 1 + 9 + sum(move.kind == "tile" for move in moves)
+    deeper = treesearch.frontier(game, moves, 2)
+    assert set(leaves) <= set(deeper)
+
+
+def test_prefetch_leaves(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "CACHE", treesearch.TranspositionTable(2 ** 24))
+    leaves = treesearch.frontier(game, game.legal_moves(pruned=True), 1)
+    treesearch.prefetch_leaves(game, leaves, 50)
+    turns = {treesearch.cache_key(*board, "turn")[0] for board in leaves.values()}
+    assert len(treesearch.CACHE) == len(leaves) + len(turns)
+    utility = treesearch.calc_utility_np(game, 50)
+    assert treesearch.CACHE.stats()["hits"] == 2
+    assert utility["utility"].shape == (3,)
+
+
+def test_prob_info(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "CACHE", treesearch.TranspositionTable(2 ** 24))
+    assert len(treesearch.turn_prob_numpy(game, 100, precision=0.1)) == 4
+    assert len(treesearch.game_prob_numpy(game, 100, precision=0.1)) == 2
+    utility, info = treesearch.calc_utility_info(game, 100, precision=0.1)
+    assert utility["utility"].shape == (3,)
+    assert set(info) == {"turn", "game"}
+    assert all(0 < val["iter"] <= 100 for val in info.values())
+    assert all(val["error"] < 1 for val in info.values())
+
+
+def test_chance_outcomes(game, monkeypatch):
+    assert len(treesearch.chance_outcomes(game, 1)) == 9
+    monkeypatch.setattr(treesearch, "chance_samples", {1: 4})
+    monkeypatch.setattr(treesearch, "chance_exact", 6)
+    rolls = treesearch.chance_outcomes(game, 1)
+    assert len(rolls) == 4
+    assert {key for key, _, _ in rolls} == set(camel_dict)
+    assert sum(weight for _, _, weight in rolls) == pytest.approx(1)
+    assert len(set(rolls)) == 4
+    assert len(treesearch.chance_outcomes(game, 2)) == 9
+    monkeypatch.setattr(treesearch, "chance_samples", {1: 2})
+    assert len(treesearch.chance_outcomes(game, 1)) == 3
+    game.camel_dict["red"]["need_roll"] = False
+    assert len(treesearch.chance_outcomes(game, 1)) == 6
+
+
+def test_exp_value_sampled(game, leaves, monkeypatch):
+    monkeypatch.setattr(treesearch, "chance_samples", {1: 3})
+    result = treesearch.exp_value(game, 1, 1)
+    assert len(leaves) == 3
+    assert result == pytest.approx([1.0, 2.0, 3.0])
+
+
+def test_cache_twin(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "CACHE", treesearch.TranspositionTable(2 ** 24))
+    monkeypatch.setattr(treesearch, "CACHE_CLASSES", dict())
+    monkeypatch.setattr(treesearch, "class_stats", True)
+    monkeypatch.setattr(treesearch, "canonical_cache", True)
+    turn_probs, game_probs, _ = treesearch.leaf_probs(game, 50)
+    twin = game.copy()
+    twin.camel_dict = {
+        "red": game.camel_dict["green"],
+        "blue": game.camel_dict["blue"],
+        "green": game.camel_dict["red"],
+    }
+    twin.rehash()
+    assert twin.position_key != game.position_key
+    twin_turn, twin_game, _ = treesearch.leaf_probs(twin, 50)
+    assert treesearch.CACHE.stats()["hits"] == 2
+    swap = {"red": "green", "blue": "blue", "green": "red"}
+    for array, twin_array in zip((*turn_probs, *game_probs), (*twin_turn, *twin_game)):
+        if "camel" in array.dtype.names:
+            probs = dict(zip(array["camel"], array["prob"]))
+            assert dict(zip(twin_array["camel"], twin_array["prob"])) == {
+                swap[camel]: prob for camel, prob in probs.items()
+            }
+    report = treesearch.cache_report()
+    assert {val["kind"] for val in report} == {"turn", "game"}
+    assert all(val["lookups"] == 2 for val in report)
+    assert all(val["hit_rate"] == 0.5 for val in report)
+    assert all(val["twins"] == 1 for val in report)
+
+
+@pytest.mark.parametrize("canonical", [True, False])
+def test_cache_rehash(game, monkeypatch, canonical):
+    monkeypatch.setattr(treesearch, "CACHE", treesearch.TranspositionTable(2 ** 24))
+    monkeypatch.setattr(treesearch, "canonical_cache", canonical)
+    treesearch.leaf_probs(game, 50)
+    game.camel_dict["green"]["space"] = 6
+    game.rehash()
+    treesearch.leaf_probs(game, 50)
+    assert treesearch.CACHE.stats()["hits"] == 0
+    game.camel_dict["green"]["space"] = 7
+    position = zobrist.position_hash(game.camel_dict, game.tiles_dict)
+    assert game.copy().position_key == position
+
+
+def test_cache_relative_turn(game, monkeypatch):
+    monkeypatch.setattr(treesearch, "CACHE", treesearch.TranspositionTable(2 ** 24))
+    monkeypatch.setattr(treesearch, "CACHE_CLASSES", dict())
+    monkeypatch.setattr(treesearch, "canonical_cache", True)
+    monkeypatch.setattr(treesearch, "relative_turns", True)
+    turn_probs, _, _ = treesearch.leaf_probs(game, 50)
+    ahead = game.copy()
+    for val in ahead.camel_dict.values():
+        val["space"] += 5
+    ahead.rehash()
+    assert key(ahead) != key(game)
+    ahead_turn, _, _ = treesearch.leaf_probs(ahead, 50)
+    assert treesearch.CACHE.stats()["hits"] == 1
+    assert [array.tolist() for array in ahead_turn] == [
+        array.tolist() for array in turn_probs
+    ]
+    near = game.copy()
+    for val in near.camel_dict.values():
+        val["space"] += 12
+    near.rehash()
+    treesearch.leaf_probs(near, 50)
+    assert treesearch.CACHE.stats()["hits"] == 1
+    assert not treesearch.CACHE_CLASSES
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `utilities` module."""
+
+import numpy as np
+
+import camelup.utilities as util
+
+
+left = np.array(
+    [(1, "red", 5), (2, "blue", 3), (1, "blue", 2), (3, "white", 8)],
+    dtype=[("player", float), ("camel", "U6"), ("value", float)],
+)
+
+right = np.array(
+    [("blue", 4, 0.4), ("red", 6, 0.6), ("blue", 5, 0.5)],
+    dtype=[("camel", "U6"), ("counts", float), ("prob", float)],
+)
+
+
+def test_numpy_left_join():
+    joined = util.numpy_left_join(left, right, "camel")
+    assert joined.dtype.names == ("player", "camel", "value", "counts", "prob")
+    assert joined["value"].tolist() == [5, 3, 2, 8]
+    assert joined["prob"].tolist() == [0.6, 0.5, 0.5, 0]
+    assert joined["counts"].tolist() == [6, 5, 5, 0]
+
+
+def test_numpy_left_join_empty():
+    joined = util.numpy_left_join(left, right[:0], "camel")
+    assert joined["prob"].tolist() == [0, 0, 0, 0]
+    assert util.numpy_left_join(left[:0], right, "camel").shape == (0,)
+
+
+def test_numpy_group_by_sum():
+    grouped = util.numpy_group_by_sum(left, "player", "value")
+    assert grouped.dtype.names == ("player", "value")
+    assert grouped["player"].tolist() == [1, 2, 3]
+    assert grouped["value"].tolist() == [7, 3, 8]
+    assert util.numpy_group_by_sum(left[:0], "player", "value").shape == (0,)
+
+
+def test_add_col_np():
+    added = util.add_col_np(left, "double", left["value"] * 2)
+    assert added.dtype.names == ("player", "camel", "value", "double")
+    assert added["double"].tolist() == [10, 6, 4, 16]
+    added = util.add_col_np(left, ["one", "two"], [1, left["player"] * 2])
+    assert added.dtype.names[-2:] == ("one", "two")
+    assert added["one"].tolist() == [1, 1, 1, 1]
+    assert added["two"].tolist() == [2, 4, 2, 6]
@@ -0,0 +1,92 @@
+"""Tests for zobrist"""
+
+import camelup.camelup as camelup
+import camelup.zobrist as zobrist
+
+from camelup.dice import BufferedRandom
+
+
+def full_hash(game):
+    return zobrist.position_hash(game.camel_dict, game.tiles_dict)
+
+
+def test_incremental_hash():
+    game = camelup.Game(2, rng=BufferedRandom(0))
+    assert game.position_key == full_hash(game)
+    game.play_tile("skip", 10)
+    assert game.position_key == full_hash(game)
+    for camel in [*game.camel_dict.keys()]:
+        game.play_roll(camel, 2)
+        assert game.position_key == full_hash(game)
+    assert not game.tiles_dict
+    assert game.copy().position_key == game.position_key
+
+
+def test_hash_changes():
+    game = camelup.Game(2, rng=BufferedRandom(0))
+    key = game.position_key
+    game.play_tile("block", 10)
+    assert game.position_key != key
+    assert zobrist.feature_key("roll", "red") == zobrist.feature_key("roll", "red")
+
+
+def test_transposition_table():
+    table = zobrist.TranspositionTable(10)
+    table.put(1, "a", 4)
+    table.put(2, "b", 4)
+    assert table.get(1) == "a"
+    table.put(3, "c", 4)
+    assert 2 not in table
+    assert table.get(2) is None
+    assert table.stats() == {
+        "entries": 2,
+        "nbytes": 8,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+    }
+    table.put(1, "d", 2)
+    assert table.nbytes == 6
+    table.clear()
+    assert len(table) == 0
+
+
+def test_shared_table():
+    shared = dict()
+    first = zobrist.SharedTable(shared, zobrist.TranspositionTable(100))
+    second = zobrist.SharedTable(shared, zobrist.TranspositionTable(100))
+    first.put(1, "a", 10)
+    assert 1 in second
+    assert second.get(1) == "a"
+    assert 1 in second.local
+    assert second.get(2) is None
+
+
+def test_canonical_hash():
+    game = camelup.Game(2, rng=BufferedRandom(0))
+    key, camels = zobrist.canonical_hash(game.camel_dict, game.tiles_dict)
+    assert [game.camel_dict[camel]["space"] for camel in camels] == sorted(
+        val["space"] for val in game.camel_dict.values()
+    )
+    first, second = camels[:2]
+    swapped = dict(game.camel_dict)
+    swapped[first], swapped[second] = swapped[second], swapped[first]
+    assert zobrist.position_hash(swapped, game.tiles_dict) != game.position_key
+    twin_key, twin_camels = zobrist.canonical_hash(swapped, game.tiles_dict)
+    assert twin_key == key
+    assert twin_camels[:2] == [second, first]
+
+
+def test_leg_hash():
+    game = camelup.Game(2, rng=BufferedRandom(0))
+    reach = 10
+    key, camels = zobrist.leg_hash(game.camel_dict, game.tiles_dict, reach)
+    shifted = {camel: dict(val) for camel, val in game.camel_dict.items()}
+    for val in shifted.values():
+        val["space"] += 2
+    rear = min(val["space"] for val in game.camel_dict.values())
+    tiles = {rear: {"tile_type": "block", "player": 1}}
+    tiles[reach + 3] = {"tile_type": "skip", "player": 2}
+    assert zobrist.leg_hash(shifted, tiles, reach + 2) == (key, camels)
+    tiles[reach] = {"tile_type": "skip", "player": 2}
+    assert zobrist.leg_hash(shifted, tiles, reach + 2)[0] != key